@@ -0,0 +1,239 @@
+"""Score history analytics with incrementally maintained aggregates.
+
+Usage: python main.py analytics [--user USER] [--dir DIR] | [--db PATH]
+
+HistoryAnalytics folds each attempt into running aggregates as it is
+recorded, so every statistic below costs O(1) to update and to read,
+however long the history is:
+
+    rolling means    of each score over the last N attempts
+    trends           least-squares change per attempt, overall and per window
+    best and worst   attempts by overall band
+    distributions    attempts reaching each half band, per score
+    progress         first, latest, best and mean band of each criterion per task
+
+Scores are named "task1", "task2" and "overall", and criterion bands
+"task1:lexical_resource" and so on. The state is plain numbers and
+round-trips through JSON, so HistoryStore keeps a snapshot of it next to
+the attempts and only replays attempts the snapshot has not seen.
+"""
+import json
+import sys
+from collections import deque
+
+SCORES = ("task1", "task2", "overall")
+ROLLING_WINDOWS = (10, 50)  # attempts averaged in the rolling means
+SNAPSHOT_VERSION = 1
+
+class Series:
+    """Running sums of one score over attempt numbers, enough for its mean, spread and trend."""
+
+    FIELDS = ("n", "sum", "sum_sq", "sum_x", "sum_xy", "sum_xx", "first", "latest", "best", "worst")
+
+    def __init__(self):
+        self.n = 0
+        self.sum = self.sum_sq = self.sum_x = self.sum_xy = self.sum_xx = 0.0
+        self.first = self.latest = None  # (attempt, value)
+        self.best = self.worst = None  # (attempt, value); the earliest attempt wins ties
+
+    def add(self, x, y):
+        self.n += 1
+        self.sum += y
+        self.sum_sq += y * y
+        self.sum_x += x
+        self.sum_xy += x * y
+        self.sum_xx += x * x
+        if self.first is None:
+            self.first = (x, y)
+        self.latest = (x, y)
+        if self.best is None or y > self.best[1]:
+            self.best = (x, y)
+        if self.worst is None or y < self.worst[1]:
+            self.worst = (x, y)
+
+    def remove(self, x, y):
+        """Takes a value back out of the sums, for sliding windows. first, best and worst are not updated."""
+        self.n -= 1
+        self.sum -= y
+        self.sum_sq -= y * y
+        self.sum_x -= x
+        self.sum_xy -= x * y
+        self.sum_xx -= x * x
+
+    @property
+    def mean(self):
+        return self.sum / self.n if self.n else None
+
+    @property
+    def stdev(self):
+        if not self.n:
+            return None
+        return max(self.sum_sq / self.n - (self.sum / self.n) ** 2, 0.0) ** 0.5
+
+    @property
+    def slope(self):
+        """Least-squares change in band per attempt, or None with fewer than two attempts."""
+        spread = self.n * self.sum_xx - self.sum_x ** 2
+        if self.n < 2 or spread <= 0:
+            return None
+        return (self.n * self.sum_xy - self.sum_x * self.sum) / spread
+
+    def to_list(self):
+        return [getattr(self, field) for field in self.FIELDS]
+
+    @classmethod
+    def from_list(cls, values):
+        series = cls()
+        for field, value in zip(cls.FIELDS, values):
+            setattr(series, field, tuple(value) if isinstance(value, list) else value)
+        return series
+
+class HistoryAnalytics:
+    """Aggregates over a history of attempts, updated in O(1) per attempt."""
+
+    def __init__(self, windows=ROLLING_WINDOWS):
+        self.windows = tuple(windows)
+        self.count = 0
+        self.last_attempt = None
+        self.series = {}  # score name -> Series over all attempts
+        self.recent = deque(maxlen=max(self.windows, default=0))  # (attempt, {score: value}) of the newest attempts
+        self.window_series = {window: {name: Series() for name in SCORES} for window in self.windows}
+        self.distribution = {}  # score name -> {band: attempts}
+
+    def add(self, attempt, scores):
+        """Folds in one attempt. scores maps score names to bands; criterion bands may be absent."""
+        self.count += 1
+        self.last_attempt = attempt
+        for name, value in scores.items():
+            if value is None:
+                continue
+            self.series.setdefault(name, Series()).add(attempt, value)
+            bands = self.distribution.setdefault(name, {})
+            bands[value] = bands.get(value, 0) + 1
+
+        if not self.windows:
+            return
+        tracked = {name: scores[name] for name in SCORES if scores.get(name) is not None}
+        for window, series in self.window_series.items():
+            if len(self.recent) >= window:
+                old_attempt, old_scores = self.recent[-window]  # slides out of this window
+                for name, value in old_scores.items():
+                    series[name].remove(old_attempt, value)
+            for name, value in tracked.items():
+                series[name].add(attempt, value)
+        self.recent.append((attempt, tracked))
+
+    def rolling_mean(self, window):
+        """Returns {score: mean} over the newest `window` attempts, or None before the first attempt."""
+        if not self.count:
+            return None
+        return {name: series.mean for name, series in self.window_series[window].items()}
+
+    def trend(self, name, window=None):
+        """Returns the least-squares change of a score per attempt, over the newest `window` attempts or all of them."""
+        series = self.window_series[window].get(name) if window else self.series.get(name)
+        return series.slope if series is not None else None
+
+    def best(self):
+        """Returns (attempt, overall band) of the best attempt, or None."""
+        series = self.series.get("overall")
+        return series.best if series is not None else None
+
+    def worst(self):
+        series = self.series.get("overall")
+        return series.worst if series is not None else None
+
+    def band_distribution(self, name="overall"):
+        """Returns {band: attempts} for a score, in band order."""
+        return dict(sorted(self.distribution.get(name, {}).items()))
+
+    def criterion_progress(self):
+        """Returns {task: {criterion: {first, latest, best, mean, change, trend}}} from the recorded criterion bands."""
+        progress = {}
+        for name, series in self.series.items():
+            task, _, criterion = name.partition(":")
+            if not criterion:
+                continue
+            progress.setdefault(task, {})[criterion] = {
+                "first": series.first[1],
+                "latest": series.latest[1],
+                "best": series.best[1],
+                "mean": series.mean,
+                "change": series.latest[1] - series.first[1],
+                "trend": series.slope,
+            }
+        return progress
+
+    def summary(self):
+        """Returns every aggregate as a JSON-ready dict of numbers."""
+        def series_stats(series):
+            return {"attempts": series.n, "mean": series.mean, "stdev": series.stdev, "trend": series.slope,
+                    "latest": series.latest[1], "best": series.best[1], "worst": series.worst[1]}
+        best, worst = self.best(), self.worst()
+        return {
+            "attempts": self.count,
+            "scores": {name: series_stats(self.series[name]) for name in SCORES if name in self.series},
+            "rolling": {window: {"means": self.rolling_mean(window), "trends": {name: self.trend(name, window) for name in SCORES}}
+                        for window in self.windows} if self.count else {},
+            "best_attempt": {"attempt": best[0], "overall": best[1]} if best else None,
+            "worst_attempt": {"attempt": worst[0], "overall": worst[1]} if worst else None,
+            "band_distribution": {name: self.band_distribution(name) for name in SCORES if name in self.distribution},
+            "criterion_progress": self.criterion_progress(),
+        }
+
+    def to_json(self):
+        return json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "windows": self.windows,
+            "count": self.count,
+            "last_attempt": self.last_attempt,
+            "series": {name: series.to_list() for name, series in self.series.items()},
+            "recent": list(self.recent),
+            "window_series": {window: {name: series.to_list() for name, series in by_name.items()}
+                              for window, by_name in self.window_series.items()},
+            "distribution": {name: list(bands.items()) for name, bands in self.distribution.items()},
+        })
+
+    @classmethod
+    def from_json(cls, text, windows=ROLLING_WINDOWS):
+        """Restores a snapshot. Raises ValueError if it is unreadable or was kept for other windows."""
+        try:
+            state = json.loads(text)
+            if state.get("version") != SNAPSHOT_VERSION or tuple(state["windows"]) != tuple(windows):
+                raise ValueError("snapshot is for another version or other windows")
+            analytics = cls(windows)
+            analytics.count = state["count"]
+            analytics.last_attempt = state["last_attempt"]
+            analytics.series = {name: Series.from_list(values) for name, values in state["series"].items()}
+            analytics.recent.extend((attempt, scores) for attempt, scores in state["recent"])
+            analytics.window_series = {int(window): {name: Series.from_list(values) for name, values in by_name.items()}
+                                       for window, by_name in state["window_series"].items()}
+            analytics.distribution = {name: dict((band, n) for band, n in bands) for name, bands in state["distribution"].items()}
+        except (TypeError, KeyError, AttributeError, json.JSONDecodeError) as e:
+            raise ValueError(f"invalid analytics snapshot ({e!r})") from None
+        return analytics
+
+def main(argv=None):
+    import argparse
+    import sqlite3
+    from history import HISTORY_DIR, HistoryStore, open_history
+
+    parser = argparse.ArgumentParser(prog="main.py analytics", description="Print score history analytics as JSON.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--user", help="user or candidate whose history to summarize (default: $IELTS_USER or the login name)")
+    source.add_argument("--db", help="score history database file to summarize instead")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="directory of the per-user histories (default: score_history next to the app)")
+    args = parser.parse_args(argv)
+    try:
+        store = HistoryStore(args.db) if args.db else open_history(args.user, args.dir)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"analytics: {e}", file=sys.stderr)
+        return 1
+    try:
+        print(json.dumps(store.analytics.summary(), indent=4))
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
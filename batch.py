@@ -0,0 +1,451 @@
+"""Headless batch scoring for whole exam cohorts.
+
+Usage: python main.py batch INPUT [-o OUTPUT] [--format jsonl|csv] [--workers N] [--no-overall]
+                            [--metrics PATH] [--profile-slowest N] [--features PATH] [--history DIR]
+                            [--delimiter LINE --task 1|2]
+
+INPUT is either a JSONL file with one essay per line, e.g.
+    {"id": "s1-t1", "candidate": "s1", "task": 1, "text": "..."}
+"-" to read such lines from stdin, or a directory of .txt files tagged with
+their task in the path, e.g.
+    cohort/alice_task1.txt, cohort/alice_task2.txt or cohort/task2/alice.txt
+With --delimiter, INPUT (or stdin) is read as plain-text essays of one task
+instead, separated by lines equal to LINE, e.g. "===".
+
+Essays are read as they are scored, with a bounded number in flight, so
+memory does not grow with the size of the corpus. Each scored essay is
+written as soon as it finishes. Once both tasks of a candidate are scored,
+an extra "overall" row carries the 40/60 weighted band. With --history,
+each overall row is also recorded as an attempt in the candidate's own score
+history partition, in batched transactions.
+With --features, a NumPy feature matrix and vectorized band scores are saved
+to an .npz file instead (requires NumPy).
+This module never imports tkinter, so pool workers start quickly.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import re
+import sys
+from collections import deque
+from functools import partial
+from itertools import chain
+
+import instrumentation
+from cache import ScoreCache
+from scoring import score_submission, overall_score
+
+CRITERIA = ["grammatical_range_and_accuracy", "lexical_resource", "task_response", "coherence_and_cohesion", "Info"]
+CSV_FIELDS = ["kind", "id", "candidate", "task", "score", "task1", "task2", "overall"] + CRITERIA
+HISTORY_BATCH = 500  # overall rows buffered before they are written to the candidates' histories
+
+_TASK_TAG_RE = re.compile(r'task[\s_-]*([12])(?!\d)', re.IGNORECASE)
+
+def _warn(message):
+    print(f"batch: {message}", file=sys.stderr)
+
+def parse_task(value):
+    """Returns 1 or 2 for a task tag such as 1, "2" or "task1", otherwise None."""
+    match = _TASK_TAG_RE.search(str(value)) or re.fullmatch(r'\s*([12])\s*', str(value))
+    return int(match.group(1)) if match else None
+
+def essay_record(obj, default_id, default_task=None):
+    """
+    Converts a decoded JSON essay object into an (id, candidate, task, text) tuple.
+    Raises ValueError describing the problem if the object is not a valid essay.
+    """
+    if not isinstance(obj, dict) or not isinstance(obj.get("text"), str):
+        raise ValueError("expected an object with a 'text' string")
+    task = parse_task(obj["task"]) if "task" in obj else default_task
+    if task is None:
+        raise ValueError("missing or invalid task type")
+    essay_id = str(obj.get("id", default_id))
+    return essay_id, str(obj.get("candidate", essay_id)), task, obj["text"]
+
+def iter_lines(chunks):
+    """Reassembles an iterable of text chunks, such as a file object, into lines without their newlines."""
+    partial_line = []
+    for chunk in chunks:
+        if '\n' not in chunk:
+            partial_line.append(chunk)
+            continue
+        lines = chunk.split('\n')
+        lines[0] = ''.join(partial_line) + lines[0]
+        partial_line = [lines.pop()]
+        yield from lines
+    tail = ''.join(partial_line)
+    if tail:
+        yield tail
+
+def iter_jsonl_essays(source, default_task=None):
+    """
+    Yields (id, candidate, task, text) tuples from JSONL, skipping invalid lines.
+    source is a path, an open text file such as sys.stdin, or an iterable of text chunks.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_jsonl_essays(f, default_task)
+        return
+    name = getattr(source, 'name', '<stream>')
+    for line_number, line in enumerate(iter_lines(source), 1):
+        if not line.strip():
+            continue
+        try:
+            yield essay_record(json.loads(line), line_number, default_task)
+        except json.JSONDecodeError as e:
+            _warn(f"{name}:{line_number}: skipped, invalid JSON ({e.msg}).")
+        except ValueError as e:
+            _warn(f"{name}:{line_number}: skipped, {e}.")
+
+def iter_text_essays(source, task, delimiter):
+    """
+    Yields (id, candidate, task, text) tuples from plain-text essays separated
+    by lines equal to delimiter (surrounding whitespace ignored). Essays are
+    numbered from 1, and blank essays are skipped. source is a path, an open
+    text file or an iterable of text chunks; only one essay is held at a time.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_text_essays(f, task, delimiter)
+        return
+    delimiter = delimiter.strip()
+    number, lines = 0, []
+    for line in chain(iter_lines(source), [None]):
+        if line is not None and line.strip() != delimiter:
+            lines.append(line)
+            continue
+        text = '\n'.join(lines)
+        lines = []
+        if text.strip():
+            number += 1
+            yield str(number), str(number), task, text
+
+def iter_directory_essays(path, default_task=None):
+    """Yields (id, candidate, task, text) tuples for every .txt file below a directory."""
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith('.txt'):
+                continue
+            file_path = os.path.join(root, name)
+            essay_id = os.path.relpath(file_path, path)
+            tags = _TASK_TAG_RE.findall(essay_id)
+            task = int(tags[-1]) if tags else default_task
+            if task is None:
+                _warn(f"{essay_id}: skipped, no task tag in the path and no --task given.")
+                continue
+            candidate = _TASK_TAG_RE.sub('', os.path.splitext(name)[0]).strip(' _-.') or os.path.basename(root)
+            with open(file_path, 'r', encoding='utf-8') as f:
+                yield essay_id, candidate, task, f.read()
+
+def iter_essays(path, default_task=None, delimiter=None):
+    """
+    Yields (id, candidate, task, text) tuples from a directory, a JSONL file or,
+    for "-", stdin. With a delimiter, the file or stdin holds plain-text essays.
+    """
+    if delimiter is not None:
+        return iter_text_essays(sys.stdin if path == "-" else path, default_task, delimiter)
+    if path == "-":
+        return iter_jsonl_essays(sys.stdin, default_task)
+    if os.path.isdir(path):
+        return iter_directory_essays(path, default_task)
+    return iter_jsonl_essays(path, default_task)
+
+def essay_row(record, result):
+    essay_id, candidate, task, _ = record
+    return {"kind": "essay", "id": essay_id, "candidate": candidate, "task": task, "score": result["score"], "reasons": result["reasons"]}
+
+def score_record(record):
+    """Scores one (id, candidate, task, text) tuple; runs inside the worker processes."""
+    return essay_row(record, score_submission(record[3], record[2]))
+
+def _score_chunk(items):
+    """Scores a list of (cache key, record) pairs; runs inside the worker processes."""
+    return [(key, score_record(record)) for key, record in items]
+
+def with_overall(rows):
+    """Passes essay rows through, adding an "overall" row once both tasks of a candidate are scored."""
+    pending = {}  # candidate -> {task: score} until both tasks are in
+    for row in rows:
+        yield row
+        if row["score"] <= 0:
+            continue
+        tasks = pending.setdefault(row["candidate"], {})
+        tasks[row["task"]] = row["score"]
+        if len(tasks) == 2:
+            del pending[row["candidate"]]
+            yield {"kind": "overall", "candidate": row["candidate"], "task1": tasks[1], "task2": tasks[2], "overall": overall_score(tasks[1], tasks[2])}
+
+def score_records(records, workers=None, chunksize=8, cache=None, metrics=None, max_pending=None, overall=True):
+    """
+    Scores essays and yields results as they finish. After both tasks of a
+    candidate have a score, an "overall" row follows unless overall is False.
+    With a ScoreCache, cached essays are answered in this process and only
+    the misses are scored. With a MetricsRegistry, per-stage scoring timings
+    from every worker are collected into it.
+
+    workers=1 scores in this process, one essay at a time. Otherwise chunks
+    of essays go to a process pool, with at most max_pending chunks (default:
+    four per worker) in flight, so records are read only as fast as they are
+    scored. Apart from that window, memory is independent of the number of
+    essays; only the overall rows keep one score per candidate still missing
+    a task.
+    """
+    rows = _scored_rows(records, workers, chunksize, cache, metrics, max_pending)
+    yield from with_overall(rows) if overall else rows
+
+def _scored_rows(records, workers, chunksize, cache, metrics, max_pending):
+    def lookup(record):
+        if cache is None:
+            return None, None
+        key = cache.key(record[3], record[2])
+        result = cache.get(key)
+        return key, None if result is None else essay_row(record, result)
+
+    def store(key, row):
+        if key is not None:
+            cache.put(key, {"score": row["score"], "reasons": row["reasons"]})
+
+    if workers == 1:
+        if metrics is not None:
+            instrumentation.enable(metrics)
+        try:
+            for record in records:
+                key, row = lookup(record)
+                if row is None:
+                    row = score_record(record)
+                    store(key, row)
+                yield row
+        finally:
+            if metrics is not None:
+                instrumentation.disable()
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # imported here so workers=1 and the worker processes skip it
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    score_chunk, options = _score_chunk, {}
+    if metrics is not None:
+        score_chunk = partial(instrumentation.call_and_drain, _score_chunk)
+        options = {"initializer": instrumentation.init_worker, "initargs": (metrics.profile_slowest,)}
+
+    def finish(future):
+        scored = future.result()
+        if metrics is not None:
+            scored, data = scored
+            metrics.merge(data)
+        for key, row in scored:
+            store(key, row)
+        return [row for _, row in scored]
+
+    pending = deque()
+    with ProcessPoolExecutor(workers, **options) as executor:
+        chunk = []
+        for record in records:
+            key, row = lookup(record)
+            if row is not None:
+                yield row
+                continue
+            chunk.append((key, record))
+            if len(chunk) == chunksize:
+                pending.append(executor.submit(score_chunk, chunk))
+                chunk = []
+            while pending and (len(pending) >= max_pending or pending[0].done()):
+                yield from finish(pending.popleft())
+        if chunk:
+            pending.append(executor.submit(score_chunk, chunk))
+        while pending:
+            yield from finish(pending.popleft())
+
+def _feature_block(records):
+    from features import feature_matrix
+    return feature_matrix([record[3] for record in records])
+
+def write_features(records, path, workers=None, chunksize=256):
+    """
+    Saves the feature matrix and vectorized band scores of the essays to an
+    .npz file, with their ids, candidates and tasks. Chunks of essays are
+    featurized on a process pool, a few at a time; only their ids and
+    features stay in this process. Returns the number of essays.
+    """
+    import numpy as np
+    from features import FEATURES, SCORE_COLUMNS, band_scores
+
+    meta, blocks, chunk = [], [], []
+    if workers == 1:
+        for record in records:
+            meta.append(record[:3])
+            chunk.append(record)
+            if len(chunk) == chunksize:
+                blocks.append(_feature_block(chunk))
+                chunk = []
+        if chunk:
+            blocks.append(_feature_block(chunk))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        pending = deque()
+        with ProcessPoolExecutor(workers) as executor:
+            for record in records:
+                meta.append(record[:3])
+                chunk.append(record)
+                if len(chunk) == chunksize:
+                    pending.append(executor.submit(_feature_block, chunk))
+                    chunk = []
+                    if len(pending) >= workers * 2:
+                        blocks.append(pending.popleft().result())
+            if chunk:
+                pending.append(executor.submit(_feature_block, chunk))
+            blocks += [future.result() for future in pending]
+    matrix = np.vstack(blocks) if blocks else np.zeros((0, len(FEATURES)))
+    ids, candidates, tasks = (list(column) for column in zip(*meta)) if meta else ([], [], [])
+    np.savez(path, ids=np.array(ids, dtype=str), candidates=np.array(candidates, dtype=str),
+             tasks=np.array(tasks, dtype=np.int8), columns=np.array(FEATURES), features=matrix,
+             score_columns=np.array(SCORE_COLUMNS), scores=band_scores(matrix, tasks))
+    return len(meta)
+
+def stream_scores(source, default_task=None, workers=1, cache=None, overall=True, delimiter=None):
+    """
+    Scores an essay stream, yielding each result row as its essay is scored.
+    source is a path, an open text file such as sys.stdin, or any iterable of
+    text chunks, holding JSONL records or, with a delimiter, plain-text essays
+    of default_task separated by delimiter lines. Each row carries the usual
+    "score" and "reasons". See score_records for the memory bounds.
+    """
+    if delimiter is not None:
+        if default_task not in (1, 2):
+            raise ValueError("plain-text essays need a task type of 1 or 2")
+        essays = iter_text_essays(source, default_task, delimiter)
+    else:
+        essays = iter_jsonl_essays(source, default_task)
+    return score_records(essays, workers, cache=cache, overall=overall)
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row):
+        self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, row):
+        flat = dict(row)
+        flat.update(row.get("reasons", {}))
+        self.writer.writerow(flat)
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter}
+
+class HistoryRecorder:
+    """
+    Records overall rows as attempts in each candidate's score history under
+    directory. Rows are buffered and written batch_size at a time, with one
+    transaction per candidate, so a cohort costs few commits and the app can
+    keep using the same histories meanwhile.
+    """
+
+    def __init__(self, directory, batch_size=HISTORY_BATCH):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.pending = {}  # candidate -> [(task1, task2, overall)]
+        self.buffered = 0
+        self.recorded = 0
+
+    def add(self, row):
+        self.pending.setdefault(row["candidate"], []).append((row["task1"], row["task2"], row["overall"]))
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        from history import open_history
+
+        pending, self.pending, self.buffered = self.pending, {}, 0
+        for candidate, attempts in pending.items():
+            try:
+                store = open_history(candidate, self.directory)
+            except ValueError as e:
+                _warn(f"not recording candidate {candidate!r}: {e}")
+                continue
+            try:
+                store.append_many(attempts)
+            finally:
+                store.close()
+            self.recorded += len(attempts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Score a cohort of IELTS essays without the GUI.")
+    parser.add_argument("input", help="JSONL file of essays, - for JSONL on stdin, or a directory of task-tagged .txt files")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="output format (default: from the output extension, else jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU; 1 scores in-process)")
+    parser.add_argument("--task", type=int, choices=(1, 2), help="task type for essays that are not tagged")
+    parser.add_argument("--delimiter", metavar="LINE", help="read INPUT as plain-text essays separated by lines equal to LINE (requires --task)")
+    parser.add_argument("--no-overall", action="store_true", help="omit the per-candidate overall rows")
+    parser.add_argument("--cache", metavar="PATH", help="reuse and update a persistent score cache at PATH")
+    parser.add_argument("--cache-size", type=int, default=100000, help="entries kept in the score cache (default: 100000)")
+    parser.add_argument("--metrics", metavar="PATH", help="write per-stage scoring timings to PATH (Prometheus text for .prom, else JSON)")
+    parser.add_argument("--profile-slowest", type=int, default=0, metavar="N", help="include cProfile output of the N slowest essays in --metrics")
+    parser.add_argument("--features", metavar="PATH", help="save a NumPy feature matrix and band scores to PATH (.npz) instead of scored rows")
+    parser.add_argument("--history", metavar="DIR", help="also record each candidate's overall band in their score history under DIR")
+    args = parser.parse_args(argv)
+
+    if args.input != "-" and not os.path.exists(args.input):
+        parser.error(f"input not found: {args.input}")
+    if args.delimiter is not None and (args.task is None or os.path.isdir(args.input)):
+        parser.error("--delimiter reads a plain-text file or stdin and requires --task")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    if args.profile_slowest and not args.metrics:
+        parser.error("--profile-slowest requires --metrics")
+    if args.history and (args.no_overall or args.features):
+        parser.error("--history records the overall rows, so it cannot be used with --no-overall or --features")
+    if args.features:
+        if importlib.util.find_spec("numpy") is None:
+            parser.error("--features requires NumPy")
+        essays = write_features(iter_essays(args.input, args.task, args.delimiter), args.features, args.workers)
+        _warn(f"saved features of {essays} essays.")
+        return 0
+    cache = ScoreCache(args.cache_size, args.cache) if args.cache else None
+    metrics = instrumentation.MetricsRegistry(args.profile_slowest) if args.metrics else None
+    recorder = HistoryRecorder(args.history) if args.history else None
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        writer = WRITERS[fmt](out)
+        essays = 0
+        rows = score_records(iter_essays(args.input, args.task, args.delimiter), args.workers, cache=cache, metrics=metrics, overall=not args.no_overall)
+        for row in rows:
+            writer.write(row)
+            essays += row["kind"] == "essay"
+            if recorder is not None and row["kind"] == "overall":
+                recorder.add(row)
+            if out is sys.stdout:
+                out.flush()  # keep piped consumers in step with the stream
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            recorder.flush()  # keep what was scored, even if the run stopped early
+    if cache is not None:
+        cache.save()
+        stats = cache.stats()
+        _warn(f"cache: {stats['hits']} hits, {stats['misses']} misses.")
+    if metrics is not None:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_prometheus() if args.metrics.lower().endswith(".prom") else metrics.to_json())
+    if recorder is not None:
+        _warn(f"recorded {recorder.recorded} attempts in {args.history}.")
+    _warn(f"scored {essays} essays.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Scoring speed benchmark over a synthetic essay corpus.
+
+Usage: python main.py bench [--sizes 150 250 1000 10000] [--essays 20] [--repeat 5] [--imports]
+                            [--save-baseline PATH] [--compare PATH] [--tolerance 0.25]
+
+Essays are generated deterministically from the prompt bank
+and a seeded vocabulary. The shared analysis stage, each criterion and the
+whole score_essay pipeline are timed separately, then reported as essays/sec
+and p50/p99 latency. A saved baseline can be compared against later runs.
+With --compare the exit status is 1 if any p50 slowed down by more than
+the tolerance. --imports also times a cold import of the scoring core and
+the batch module, as reported by python -X importtime in a fresh interpreter.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+
+from prompts import default_bank
+from scoring import (analyze_essay, assess_coherence_and_cohesion, assess_grammatical_range_and_accuracy,
+                     assess_lexical_resource, assess_task_1_response, assess_task_2_response, cohesive_devices, score_essay)
+
+ESSAY_SIZES = (150, 250, 1000, 10000)
+IMPORT_MODULES = ("scoring", "batch")  # what a headless scoring process loads
+
+FUNCTION_WORDS = [
+    "the", "of", "and", "to", "in", "is", "that", "for", "it", "as", "with", "be", "on", "not", "this",
+    "are", "by", "which", "can", "more", "their", "they", "there", "than", "these", "would", "from", "an", "a",
+]
+VOCABULARY = [
+    "people", "government", "society", "significant", "individuals", "education", "economic", "environment",
+    "development", "responsibility", "increase", "decrease", "proportion", "percentage", "approximately",
+    "considerably", "substantial", "benefit", "disadvantage", "consequence", "opportunity", "community",
+    "technology", "information", "generation", "investment", "public", "services", "children", "parents",
+    "families", "problems", "adult", "life", "money", "wealthy", "experience", "important", "example",
+    "argue", "believe", "suggest", "demonstrate", "illustrate", "compare", "contrast", "figure", "period",
+    "trend", "rise", "fall", "peak", "steady", "gradual", "dramatic", "overall", "clearly", "perhaps",
+    "local", "international", "tourism", "culture", "tradition", "animals", "rights", "humans", "needs",
+    "arts", "music", "theatre", "health", "transport", "future", "negative", "positive", "effects", "view",
+    "process", "stage", "final", "initial", "produce", "material", "temperature", "hours", "market",
+]
+ERROR_PHRASES = ["a important", "an big", "he have", "it are", "futhermore"]
+
+_PROMPT_WORD_RE = re.compile(r'[A-Za-z]{4,}')
+
+def generate_essay(task_type, word_count, rng):
+    """Returns a synthetic essay of exactly word_count words on a random prompt for the task."""
+    bank = default_bank()
+    prompt = bank.get(rng.choice(bank.ids(task=task_type)))["text"]
+    topic_words = [w.lower() for w in _PROMPT_WORD_RE.findall(prompt)]
+    num_paragraphs = max(4, word_count // 180)
+    paragraph_words = word_count / num_paragraphs
+
+    paragraphs, sentences, words_left, paragraph_budget = [], [], word_count, paragraph_words
+    while words_left > 0:
+        sentence = []
+        if rng.random() < 0.3:
+            sentence.extend(rng.choice(cohesive_devices().phrases).split())
+        if rng.random() < 0.03:
+            sentence.extend(rng.choice(ERROR_PHRASES).split())
+        for _ in range(rng.randint(10, 22)):
+            roll = rng.random()
+            pool = FUNCTION_WORDS if roll < 0.45 else topic_words if roll < 0.75 else VOCABULARY
+            sentence.append(rng.choice(pool))
+        sentence = sentence[:words_left]
+        words_left -= len(sentence)
+        paragraph_budget -= len(sentence)
+        sentences.append(" ".join(sentence).capitalize() + ".")
+        if paragraph_budget <= 0 or words_left <= 0:
+            paragraphs.append(" ".join(sentences))
+            sentences, paragraph_budget = [], paragraph_words
+    return "\n\n".join(paragraphs)
+
+def generate_corpus(sizes=ESSAY_SIZES, essays_per_size=20, seed=7):
+    """Returns {size: [(task_type, essay), ...]}, alternating Task 1 and Task 2 essays."""
+    rng = random.Random(seed)
+    return {size: [(1 + i % 2, generate_essay(1 + i % 2, size, rng)) for i in range(essays_per_size)] for size in sizes}
+
+def _measurements(task_type, text):
+    """Returns (name, zero-argument callable) pairs for one essay."""
+    analysis = analyze_essay(text)
+    task_response = assess_task_1_response if task_type == 1 else assess_task_2_response
+    return [
+        ("analysis", lambda: analyze_essay(text)),
+        ("grammatical_range_and_accuracy", lambda: assess_grammatical_range_and_accuracy(analysis)),
+        ("lexical_resource", lambda: assess_lexical_resource(analysis)),
+        ("task_response", lambda: task_response(analysis)),
+        ("coherence_and_cohesion", lambda: assess_coherence_and_cohesion(analysis)),
+        ("score_essay", lambda: score_essay(text, task_type)),
+    ]
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def run_benchmark(corpus, repeat=5):
+    """Times every measurement over the corpus; returns {size: {name: stats}}."""
+    results = {}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # as timeit does, keep collector pauses out of the samples
+    try:
+        for size, essays in corpus.items():
+            timings = {}
+            for task_type, text in essays:
+                for name, func in _measurements(task_type, text):
+                    samples = timings.setdefault(name, [])
+                    func()  # warm-up
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        func()
+                        samples.append(time.perf_counter() - start)
+            results[str(size)] = {name: _summarize(samples) for name, samples in timings.items()}
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return results
+
+def _import_seconds(module):
+    """Returns the cumulative -X importtime of module in a fresh interpreter, in seconds."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1e6
+    raise ValueError(f"no importtime entry for {module}")
+
+def time_imports(modules=IMPORT_MODULES, repeat=5):
+    """Times cold imports of each module; returns {"import": {name: stats}} in run_benchmark's format."""
+    results = {}
+    for module in modules:
+        _import_seconds(module)  # warm-up, which also writes the bytecode caches
+        results[f"import {module}"] = _summarize([_import_seconds(module) for _ in range(repeat)])
+    return {"import": results}
+
+def _summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "calls": len(samples),
+        "essays_per_sec": round(len(samples) / total, 1) if total else None,
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 4),
+    }
+
+def compare(results, baseline, tolerance):
+    """Returns (size, name, baseline p50, current p50, relative change) rows and whether any regressed."""
+    rows, regressed = [], False
+    for size, measurements in results.items():
+        for name, stats in measurements.items():
+            before = baseline.get(size, {}).get(name)
+            if not before or not before.get("p50_ms"):
+                continue
+            change = stats["p50_ms"] / before["p50_ms"] - 1
+            regressed |= change > tolerance
+            rows.append((size, name, before["p50_ms"], stats["p50_ms"], change))
+    return rows, regressed
+
+def print_results(results):
+    print(f"{'words':>6}  {'measurement':<32}{'essays/sec':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for size, measurements in results.items():
+        for name, stats in measurements.items():
+            print(f"{size:>6}  {name:<32}{stats['essays_per_sec']:>12}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py bench", description="Benchmark essay scoring on a synthetic corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(ESSAY_SIZES), help="essay lengths in words")
+    parser.add_argument("--essays", type=_positive_int, default=20, help="essays generated per length (default: 20)")
+    parser.add_argument("--repeat", type=_positive_int, default=5, help="timed calls per essay and measurement (default: 5)")
+    parser.add_argument("--seed", type=int, default=7, help="corpus random seed (default: 7)")
+    parser.add_argument("--imports", action="store_true", help="also time cold imports of " + " and ".join(IMPORT_MODULES))
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before failing (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.sizes, args.essays, args.seed)
+    results = run_benchmark(corpus, args.repeat)
+    if args.imports:
+        results.update(time_imports(repeat=args.repeat))
+    print_results(results)
+
+    if args.save_baseline:
+        report = {
+            "meta": {"python": platform.python_version(), "platform": platform.platform(), "seed": args.seed,
+                     "essays": args.essays, "repeat": args.repeat, "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        rows, regressed = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.compare} (tolerance {args.tolerance:.0%}):")
+        for size, name, before, after, change in rows:
+            flag = "  REGRESSION" if change > args.tolerance else ""
+            print(f"{size:>6}  {name:<32}{before:>10.3f} -> {after:<10.3f}{change:>+8.1%}{flag}")
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
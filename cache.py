@@ -0,0 +1,142 @@
+"""Bounded LRU cache of essay scores, keyed by a content hash.
+
+Keys combine a fingerprint of the scoring rules with the task type and the
+stripped essay text, so editing the rules invalidates every cached result,
+including ones persisted to disk by an earlier run.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import grammar
+import lexicon
+import phrases
+import scoring
+
+RULE_SOURCES = [  # files whose contents define the scoring rules
+    scoring.__file__,
+    grammar.__file__,
+    grammar.DEFAULT_RULE_FILE,
+    phrases.__file__,
+    phrases.DEFAULT_PHRASE_FILE,
+    lexicon.__file__,  # its thresholds shape the vocabulary profile feedback
+]
+
+_fingerprint = None
+
+def rules_fingerprint():
+    """Returns a hash of every file in RULE_SOURCES and of the lexicon, computed once per process."""
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        for path in RULE_SOURCES:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        lex = scoring.word_lexicon()
+        if lex is not None:
+            digest.update(lex.digest.encode())  # the file can be large; its header holds a content hash
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+def _copy_result(result):
+    """Copies a result and its nested dicts, so callers can never change what the cache holds."""
+    return {name: dict(value) if isinstance(value, dict) else value for name, value in result.items()}
+
+def normalize_essay(essay_text):
+    """Strips surrounding whitespace, which never changes the score or the feedback."""
+    return essay_text.strip()
+
+class ScoreCache:
+    """Thread-safe LRU mapping of essay hashes to score_submission results."""
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        if path:
+            self.load()
+
+    def key(self, essay_text, task_type):
+        data = f"{rules_fingerprint()}\0{task_type}\0{normalize_essay(essay_text)}"
+        return hashlib.sha256(data.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def get(self, key):
+        """Returns the cached result for a key, or None, counting the hit or miss."""
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(result)
+
+    def put(self, key, result):
+        result = _copy_result(result)
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def score(self, essay_text, task_type):
+        """Returns score_submission(essay_text, task_type), reusing a cached result when possible."""
+        key = self.key(essay_text, task_type)
+        result = self.get(key)
+        if result is None:
+            result = scoring.score_submission(essay_text, task_type)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def load(self):
+        """Loads persisted entries, discarding them if they were made under different scoring rules."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("fingerprint") != rules_fingerprint():
+            return
+        with self.lock:
+            for key, result in data.get("entries", [])[-self.maxsize:]:
+                self.entries[key] = result
+
+    def save(self):
+        """Writes the entries to self.path atomically, least recently used first."""
+        if not self.path:
+            return
+        with self.lock:
+            data = {"fingerprint": rules_fingerprint(), "entries": list(self.entries.items())}
+        # A temporary file of its own, so instances saving to the same path at once never write into each other's.
+        directory, name = os.path.split(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix=name + ".", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(data, f, ensure_ascii=False)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, self.path)
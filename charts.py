@@ -0,0 +1,306 @@
+"""Task 1 chart geometry, drawn on a Tk canvas or exported without one.
+
+Usage: python main.py charts [PROMPT_ID ...] [-o DIR] [--format ps|png] [--scale N]
+
+A chart is laid out once into a tuple of ChartItems, plain canvas drawing
+calls, and cached per prompt id. ChartView creates the canvas items of each
+chart the first time it is shown, all tagged with the chart's tag, and from
+then on switching prompts only hides one tag and shows another.
+
+The same items export to PostScript with the standard library, or to PNG
+when Pillow is installed, so the headless and web paths can serve the
+charts without a display.
+"""
+import argparse
+import importlib.util
+import math
+import os
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+from prompts import default_bank
+
+CHART_WIDTH, CHART_HEIGHT = 480, 220
+TITLE_FONT = ("Helvetica", 10, "bold")
+TEXT_SIZE = 9  # point size of text without a font in exports, close to Tk's default
+ARROW_LENGTH, ARROW_WIDTH = 10, 3  # arrowhead length and half-width beyond the line, as Tk draws them
+
+ChartItem = namedtuple('ChartItem', [
+    'kind',     # canvas item type: "line", "rectangle" or "text"
+    'coords',   # flat tuple of x, y canvas coordinates
+    'options',  # keyword options for canvas.create_<kind>
+])
+
+def _text(x, y, text, **options):
+    return ChartItem("text", (x, y), dict(options, text=text))
+
+def bar_chart(data):
+    items = [_text(CHART_WIDTH/2, 10, data['title'], font=TITLE_FONT)]
+    max_val = max(max(s['values']) for s in data['series'])
+    y_axis_height = CHART_HEIGHT - 50
+    x_axis_width = CHART_WIDTH - 60
+
+    # Y-axis
+    items.append(ChartItem("line", (50, 20, 50, y_axis_height), {}))
+    for i in range(5):
+        val = max_val * (1 - i/4)
+        y = 20 + (i * (y_axis_height - 20) / 4)
+        items.append(ChartItem("line", (45, y, 50, y), {}))
+        items.append(_text(35, y, f"{val:.0f}", anchor="e"))
+
+    # X-axis
+    items.append(ChartItem("line", (50, y_axis_height, CHART_WIDTH-10, y_axis_height), {}))
+
+    num_groups = len(data['x_labels'])
+    num_series = len(data['series'])
+    group_width = x_axis_width / num_groups
+    bar_width = (group_width * 0.8) / num_series
+
+    for i, label in enumerate(data['x_labels']):
+        group_x = 50 + (i * group_width)
+        items.append(_text(group_x + group_width/2, y_axis_height + 10, label))
+        for j, series in enumerate(data['series']):
+            bar_x1 = group_x + (group_width * 0.1) + (j * bar_width)
+            bar_y1 = y_axis_height - (series['values'][i] / max_val * (y_axis_height - 20))
+            items.append(ChartItem("rectangle", (bar_x1, bar_y1, bar_x1 + bar_width, y_axis_height), {"fill": series['color']}))
+    return items
+
+def line_graph(data):
+    items = [_text(CHART_WIDTH/2, 10, data['title'], font=TITLE_FONT)]
+    max_val = max(max(s['values']) for s in data['series'])
+    y_axis_height = CHART_HEIGHT - 50
+    x_axis_width = CHART_WIDTH - 60
+
+    # Y-axis
+    items.append(ChartItem("line", (50, 20, 50, y_axis_height), {}))
+    for i in range(6):
+        val = max_val * (1 - i/5)
+        y = 20 + (i * (y_axis_height - 20) / 5)
+        items.append(ChartItem("line", (45, y, 50, y), {}))
+        items.append(_text(40, y, f"{val:.0f}%", anchor="e"))
+
+    # X-axis
+    items.append(ChartItem("line", (50, y_axis_height, CHART_WIDTH-10, y_axis_height), {}))
+
+    num_points = len(data['x_labels'])
+    for series in data['series']:
+        points = []
+        for i, val in enumerate(series['values']):
+            x = 50 + (i * x_axis_width / (num_points-1))
+            y = y_axis_height - (val / max_val * (y_axis_height - 20))
+            points.extend([x, y])
+            if i % 2 == 0:
+                items.append(_text(x, y_axis_height + 10, data['x_labels'][i]))
+        items.append(ChartItem("line", tuple(points), {"fill": series['color'], "width": 2}))
+        items.append(_text(x + 5, y, series['name'], fill=series['color'], anchor="w"))
+    return items
+
+def diagram(data):
+    items = [_text(CHART_WIDTH/2, 10, data['title'], font=TITLE_FONT)]
+    box_w, box_h = 100, 50
+    x_spacing, y_spacing = 20, 30
+    arrow = {"arrow": "last", "width": 1.5}
+
+    positions = []
+    for i, step in enumerate(data['steps']):
+        row = i // 4
+        col = i % 4
+        x = col * (box_w + x_spacing) + 30
+        y = row * (box_h + y_spacing) + 40
+        positions.append((x + box_w/2, y + box_h/2))
+
+        items.append(ChartItem("rectangle", (x, y, x + box_w, y + box_h), {"fill": "#e0e0e0", "outline": "black"}))
+        items.append(_text(x + box_w/2, y + box_h/2, step['label'], justify="center"))
+
+    # Arrows are laid out once every box has a position, so they may also point back.
+    for i, step in enumerate(data['steps']):
+        if step['arrow_to'] is None:
+            continue
+        from_pos = positions[i]
+        to_pos = positions[step['arrow_to']]
+        if to_pos[0] > from_pos[0]:  # Arrow right
+            start_x, start_y = from_pos[0] + box_w/2, from_pos[1]
+            end_x, end_y = to_pos[0] - box_w/2, to_pos[1]
+            items.append(ChartItem("line", (start_x, start_y, end_x, end_y), arrow))
+        else:  # Arrow wraps around to the next line
+            start_x, start_y = from_pos[0], from_pos[1] + box_h/2
+            mid_y = start_y + y_spacing/2
+            end_x, end_y = to_pos[0], to_pos[1] - box_h/2
+            items.append(ChartItem("line", (start_x, start_y, start_x, mid_y, end_x, mid_y, end_x, end_y), arrow))
+    return items
+
+CHART_TYPES = {"bar_chart": bar_chart, "line_graph": line_graph, "diagram": diagram}
+
+def build_chart(chart_type, data):
+    """Lays out a chart as a tuple of ChartItems; an unknown chart type has none."""
+    layout = CHART_TYPES.get(chart_type)
+    return tuple(layout(data)) if layout is not None else ()
+
+@lru_cache(maxsize=1024)
+def prompt_chart(prompt_id):
+    """Returns the ChartItems of a Task 1 prompt in the prompt bank, laid out on first use. Raises KeyError for any other id."""
+    prompt = default_bank().get(prompt_id)
+    if prompt["task"] != 1:
+        raise KeyError(prompt_id)
+    return build_chart(prompt["type"], prompt["data"])
+
+class ChartView:
+    """Shows prompt charts on a Tk canvas, creating each chart's items only once."""
+
+    def __init__(self, canvas, charts=prompt_chart):
+        self.canvas = canvas
+        self.charts = charts  # key -> ChartItems
+        self.drawn = set()
+        self.shown = None
+
+    def show(self, key):
+        """Hides the chart on display and shows the chart for key."""
+        if key == self.shown:
+            return
+        tag = f"chart-{key}"
+        if key not in self.drawn:
+            for kind, coords, options in self.charts(key):
+                getattr(self.canvas, f"create_{kind}")(*coords, tags=(tag,), state="hidden", **options)
+            self.drawn.add(key)
+        if self.shown is not None:
+            self.canvas.itemconfigure(f"chart-{self.shown}", state="hidden")
+        self.canvas.itemconfigure(tag, state="normal")
+        self.shown = key
+
+# --- Export ---
+
+def _rgb(color):
+    if color.startswith('#') and len(color) == 7:
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return {"black": (0, 0, 0), "white": (255, 255, 255)}.get(color, (0, 0, 0))
+
+def _font_size(options):
+    font = options.get("font")
+    return font[1] if font else TEXT_SIZE
+
+def _arrowhead(coords, width):
+    """Returns the triangle (tip, left, right) of an arrow at the end of a line."""
+    (x0, y0), (x1, y1) = coords[-4:-2], coords[-2:]
+    length = math.hypot(x1 - x0, y1 - y0) or 1
+    dx, dy = (x1 - x0) / length, (y1 - y0) / length
+    base_x, base_y = x1 - dx * ARROW_LENGTH, y1 - dy * ARROW_LENGTH
+    half = ARROW_WIDTH + width / 2
+    return (x1, y1), (base_x - dy * half, base_y + dx * half), (base_x + dy * half, base_y - dx * half)
+
+def _text_lines(y, options, line_height):
+    """Returns (baseline offset of the first line, lines) for a text item anchored vertically at y."""
+    lines = options["text"].split('\n')
+    top = y - len(lines) * line_height / 2
+    return top + line_height * 0.8, lines
+
+def _ps_string(text):
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+def to_postscript(items, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Renders ChartItems as an Encapsulated PostScript document."""
+    out = [
+        "%!PS-Adobe-3.0 EPSF-3.0",
+        f"%%BoundingBox: 0 0 {width} {height}",
+        "%%EndComments",
+        f"0 {height} translate 1 -1 scale",  # canvas coordinates: y grows downwards
+        "1 setlinejoin",
+    ]
+    for kind, coords, options in items:
+        r, g, b = (c / 255 for c in _rgb(options.get("fill", "black")))
+        if kind == "rectangle":
+            x1, y1, x2, y2 = coords
+            path = f"newpath {x1:.2f} {y1:.2f} moveto {x2:.2f} {y1:.2f} lineto {x2:.2f} {y2:.2f} lineto {x1:.2f} {y2:.2f} lineto closepath"
+            if "fill" in options:
+                out.append(f"{path} {r:.3f} {g:.3f} {b:.3f} setrgbcolor fill")
+            r, g, b = (c / 255 for c in _rgb(options.get("outline", "black")))
+            out.append(f"{path} {r:.3f} {g:.3f} {b:.3f} setrgbcolor 1 setlinewidth stroke")
+        elif kind == "line":
+            width_ = options.get("width", 1)
+            points = " ".join(f"{x:.2f} {y:.2f} lineto" for x, y in zip(coords[2::2], coords[3::2]))
+            out.append(f"{r:.3f} {g:.3f} {b:.3f} setrgbcolor {width_} setlinewidth")
+            out.append(f"newpath {coords[0]:.2f} {coords[1]:.2f} moveto {points} stroke")
+            if options.get("arrow") == "last":
+                (tx, ty), (lx, ly), (rx, ry) = _arrowhead(coords, width_)
+                out.append(f"newpath {tx:.2f} {ty:.2f} moveto {lx:.2f} {ly:.2f} lineto {rx:.2f} {ry:.2f} lineto closepath fill")
+        elif kind == "text":
+            size = _font_size(options)
+            face = "Helvetica-Bold" if "bold" in options.get("font", ()) else "Helvetica"
+            shift = {"e": -1, "w": 0}.get(options.get("anchor"), -0.5)  # share of the width left of x
+            baseline, lines = _text_lines(coords[1], options, size * 1.2)
+            out.append(f"/{face} findfont [{size} 0 0 -{size} 0 0] makefont setfont {r:.3f} {g:.3f} {b:.3f} setrgbcolor")
+            for n, line in enumerate(lines):
+                out.append(f"{coords[0]:.2f} {baseline + n * size * 1.2:.2f} moveto {_ps_string(line)} "
+                           f"dup stringwidth pop {shift} mul 0 rmoveto show")
+    out += ["showpage", "%%EOF", ""]
+    return "\n".join(out)
+
+def png_available():
+    return importlib.util.find_spec("PIL") is not None
+
+def to_png(items, scale=2, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Renders ChartItems as PNG bytes, scale pixels per canvas unit. Requires Pillow."""
+    import io
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", (round(width * scale), round(height * scale)), "white")
+    draw = ImageDraw.Draw(image)
+    fonts = {}
+    for kind, coords, options in items:
+        points = [c * scale for c in coords]
+        fill = _rgb(options.get("fill", "black"))
+        if kind == "rectangle":
+            x1, y1, x2, y2 = points
+            draw.rectangle((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)),
+                           fill=fill if "fill" in options else None, outline=_rgb(options.get("outline", "black")), width=max(1, round(scale)))
+        elif kind == "line":
+            width_ = options.get("width", 1)
+            draw.line(points, fill=fill, width=max(1, round(width_ * scale)), joint="curve")
+            if options.get("arrow") == "last":
+                draw.polygon([(x * scale, y * scale) for x, y in _arrowhead(coords, width_)], fill=fill)
+        elif kind == "text":
+            size = _font_size(options) * scale * 4 / 3  # points to pixels
+            if size not in fonts:
+                fonts[size] = ImageFont.load_default(size)
+            anchor = {"e": "rm", "w": "lm"}.get(options.get("anchor"), "mm")
+            draw.multiline_text(points, options["text"], fill=fill, font=fonts[size], anchor=anchor, align="center")
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+EXPORT_FORMATS = {"ps": "application/postscript", "png": "image/png"}
+
+@lru_cache(maxsize=256)
+def export_chart(prompt_id, fmt="ps", scale=2):
+    """Returns the chart of a Task 1 prompt as PostScript or PNG bytes, cached. Raises KeyError for an unknown id."""
+    if fmt == "png":
+        return to_png(prompt_chart(prompt_id), scale)
+    return to_postscript(prompt_chart(prompt_id)).encode('latin-1')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py charts", description="Export the Task 1 prompt charts.")
+    parser.add_argument("prompts", nargs="*", metavar="PROMPT_ID", help="Task 1 prompts to export (default: all)")
+    parser.add_argument("-o", "--output", default=".", metavar="DIR", help="directory to write PROMPT_ID.ps or PROMPT_ID.png to (default: .)")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ps", help="output format (default: ps; png needs Pillow)")
+    parser.add_argument("--scale", type=float, default=2, help="PNG pixels per canvas unit (default: 2)")
+    args = parser.parse_args(argv)
+    task_1_ids = default_bank().ids(task=1)
+    prompt_ids = args.prompts or task_1_ids
+    unknown = set(prompt_ids) - set(task_1_ids)
+    if unknown:
+        parser.error(f"no Task 1 prompt with id {', '.join(sorted(unknown))}")
+    if args.format == "png" and not png_available():
+        print("charts: PNG export needs Pillow (pip install pillow)", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    for prompt_id in prompt_ids:
+        path = os.path.join(args.output, f"{prompt_id}.{args.format}")
+        with open(path, 'wb') as f:
+            f.write(export_chart(prompt_id, args.format, args.scale))
+    print(f"charts: wrote {len(prompt_ids)} {args.format} files to {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Bulk feature extraction and vectorized band scoring with NumPy.
+
+feature_matrix() turns a list of essays into one row of FEATURES per essay,
+and band_scores() applies the thresholds of the four criteria to the whole
+matrix at once. The resulting scores equal score_essay exactly; reasons are
+not produced. This is meant for scoring large corpora, e.g. in calibration
+studies, where building a result dict per essay would dominate.
+
+NumPy is only needed by this module, which the GUI and the scoring service
+never import.
+"""
+from itertools import chain
+
+import numpy as np
+
+from scoring import analyze_essay, cohesive_devices, grammar_rules
+
+WORD_LENGTH_BINS = 13  # histogram bins for word lengths 1..12 and 13 or more
+CATEGORIES = list(dict.fromkeys(cohesive_devices().categories.values()))
+
+_COUNTS = [
+    "word_count",        # words counted for task response
+    "lexical_words",     # lowercased word tokens used for lexical resource
+    "letters",           # total length of those words
+    "distinct_words",    # distinct lowercased words
+    "connectors",        # scored connectors found, as counted by the coherence criterion
+    "paragraphs",        # blank-line separated paragraphs
+    "grammar_issues",    # feedback items, as counted by the grammar criterion
+    "grammar_matches",   # individual grammar rule matches
+] + [f"connectors_{category}" for category in CATEGORIES]
+FEATURES = _COUNTS + ["mean_word_length", "type_token_ratio"] + [
+    f"word_length_{n}" for n in range(1, WORD_LENGTH_BINS)] + [f"word_length_{WORD_LENGTH_BINS}_plus"]
+SCORE_COLUMNS = ["grammatical_range_and_accuracy", "lexical_resource", "task_response", "coherence_and_cohesion", "score"]
+
+_COLUMN = {name: i for i, name in enumerate(FEATURES)}
+
+def _counts(analysis):
+    counts = analysis.connector_counts
+    devices = cohesive_devices()
+    categories = devices.by_category(counts)
+    return [
+        analysis.word_count,
+        len(analysis.words),
+        sum(analysis.word_lengths),
+        len(set(analysis.words)),
+        devices.scored_count(counts),
+        len(analysis.paragraphs),
+        len(grammar_rules().issues(analysis.grammar_matches)),
+        len(analysis.grammar_matches),
+    ] + [categories.get(category, 0) for category in CATEGORIES]
+
+def feature_matrix(essays):
+    """Returns a float64 array with one row of FEATURES per essay text (or EssayAnalysis)."""
+    analyses = [analyze_essay(essay) for essay in essays]
+    n = len(analyses)
+    counts = np.array([_counts(analysis) for analysis in analyses], dtype=np.float64).reshape(n, len(_COUNTS))
+    words, letters = counts[:, _COLUMN["lexical_words"]], counts[:, _COLUMN["letters"]]
+    has_words = words > 0
+    mean_length = np.divide(letters, words, out=np.zeros(n), where=has_words)
+    ratio = np.divide(counts[:, _COLUMN["distinct_words"]], words, out=np.zeros(n), where=has_words)
+
+    lengths = np.fromiter(chain.from_iterable(analysis.word_lengths for analysis in analyses), dtype=np.int64)
+    owners = np.repeat(np.arange(n), [len(analysis.word_lengths) for analysis in analyses])
+    bins = owners * WORD_LENGTH_BINS + np.minimum(lengths, WORD_LENGTH_BINS) - 1
+    histogram = np.bincount(bins, minlength=n * WORD_LENGTH_BINS).reshape(n, WORD_LENGTH_BINS)
+
+    return np.column_stack([counts, mean_length, ratio, histogram]).astype(np.float64)
+
+def band_scores(features, task_types):
+    """
+    Returns an array with one row of SCORE_COLUMNS per essay: the band of each
+    criterion and the overall score_essay score, from a feature_matrix().
+    task_types is a sequence of 1 or 2 per row.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    column = lambda name: features[:, _COLUMN[name]]
+    task_types = np.asarray(task_types)
+
+    issues = column("grammar_issues")
+    grammar = np.select([issues == 0, issues == 1, issues <= 3], [9.0, 7.5, 6.0], 5.0)
+
+    # avg > 5.2 -> 9.0, > 4.8 -> 8.0, > 4.5 -> 7.0, > 4.2 -> 6.0, > 3.8 -> 5.0, else 4.0
+    lexical = np.array([4.0, 5.0, 6.0, 7.0, 8.0, 9.0])[np.digitize(column("mean_word_length"), [3.8, 4.2, 4.5, 4.8, 5.2], right=True)]
+    lexical[column("lexical_words") == 0] = 4.0
+
+    # word count < min -> 4.0, < target -> 5.0, <= limit -> 8.0, else 7.0
+    word_count = column("word_count")
+    length_bands = np.array([4.0, 5.0, 8.0, 7.0])
+    task_response = np.where(task_types == 1,
+                             length_bands[np.digitize(word_count, [120, 150, 251])],
+                             length_bands[np.digitize(word_count, [200, 250, 351])])
+
+    connectors, paragraphs = column("connectors"), column("paragraphs")
+    points = (np.select([connectors >= 5, connectors >= 3], [2, 1], 0)
+              + np.select([(paragraphs >= 3) & (paragraphs <= 5), paragraphs > 1], [2, 1], 0))
+    coherence = np.array([4.5, 5.5, 6.5, 7.5, 8.5])[points]
+
+    overall = np.round((grammar + lexical + task_response + coherence) / 4 * 2) / 2
+    return np.column_stack([grammar, lexical, task_response, coherence, overall])
+
+def score_essays(essays, task_types):
+    """Scores a batch of essays; equivalent to score_essay(essay, task)["score"] for each."""
+    return band_scores(feature_matrix(essays), task_types)[:, -1]
@@ -0,0 +1,252 @@
+"""Data-driven grammar and spelling rules.
+
+A rule file is a JSON object whose "rules" list holds three kinds of rule:
+
+    {"id": "subject-verb", "message": "...", "patterns": [{"tokens": ["he|she|it", "are|have"]}]}
+        Token patterns. Each entry of "tokens" lists alternative words, matched
+        case-insensitively against consecutive words with only whitespace between
+        them. An optional "next_char" such as "aeiou" (or "^aeiou") requires the
+        first character after the following whitespace to be (or not be) one of
+        those letters. The patterns of a rule are alternatives, like a regex "|":
+        the first one that matches at a word wins, and matches never overlap.
+    {"id": "...", "message": "...", "regex": "..."}
+        A regular expression, matched case-insensitively. Numbered
+        backreferences are not supported.
+    {"id": "spelling", "message": "...", "misspellings": {"futhermore": "furthermore"}}
+        Whole-word misspellings, reported once per distinct word.
+
+Messages are format strings taking {count} and {example} (the first match as
+written), or {word} and {correction} for misspellings. A rule whose tokens list
+is empty, whose regex can match empty text or cannot be joined to the earlier
+regex rules, or whose message uses other placeholders is rejected at load.
+
+A RuleSet indexes token patterns and misspellings by their first word, so a
+scan costs one dict lookup per word however many rules there are, and joins
+all regex rules into one alternation that is run over the text once. Regex
+rules therefore never overlap each other; where two match at the same place,
+the one listed first wins. An IncrementalScan rescans successive versions of
+a text, reusing the token pattern matches before the first changed word.
+"""
+import os
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import chain, compress, count, islice
+from operator import ne
+
+DEFAULT_RULE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar_rules.json")
+
+GrammarMatch = namedtuple('GrammarMatch', [
+    'rule',   # id of the rule that matched
+    'start',  # character offset of the match in the essay
+    'end',    # offset just past the match
+    'text',   # the matched text as written
+])
+
+_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})  # also equal to ASCII letters under re.IGNORECASE
+
+def fold(word):
+    """Lowercases a word so that it compares the way re.IGNORECASE would."""
+    return word.lower() if word.isascii() else word.translate(_FOLD).lower()
+
+_EMPTY_MATCH_PROBE = "An essay, in short: 2 words.\n\nThe end"  # a regex that matches empty text here is rejected
+
+def _char_variants(chars):
+    """Returns every character that fold() maps onto one of the lowercase chars."""
+    special = {'i': 'İı', 's': 'ſ', 'k': '\u212a'}
+    return frozenset(''.join(c + c.upper() + special.get(c, '') for c in chars))
+
+class Rule:
+    def __init__(self, rule_id, message, corrections=None):
+        self.id = rule_id
+        self.message = message
+        self.corrections = corrections  # misspelling -> correction, for misspelling tables
+        try:
+            if corrections is None:
+                message.format(count=1, example="")
+            else:
+                message.format(word="", correction="")
+        except (KeyError, IndexError, ValueError) as e:
+            names = "{count} and {example}" if corrections is None else "{word} and {correction}"
+            raise ValueError(f"message {message!r} may only use {names} ({e!r})") from e
+
+    def issues(self, matches):
+        """Returns the feedback messages for this rule's matches."""
+        if self.corrections is None:
+            return [self.message.format(count=len(matches), example=matches[0].text)]
+        words = dict.fromkeys(fold(match.text) for match in matches)
+        return [self.message.format(word=word, correction=self.corrections[word]) for word in words]
+
+class _Pattern:
+    __slots__ = ('rule', 'tokens', 'rest', 'next_chars', 'negated')
+
+    def __init__(self, rule, tokens, next_char=None):
+        if not isinstance(tokens, list) or not tokens:
+            raise ValueError("'tokens' must be a non-empty list")
+        self.rule = rule
+        self.tokens = [frozenset(fold(word) for word in alternatives.split('|')) for alternatives in tokens]
+        self.rest = self.tokens[1:]
+        self.negated = bool(next_char) and next_char.startswith('^')
+        self.next_chars = _char_variants(fold(next_char.lstrip('^'))) if next_char else None
+
+    def match(self, pairs, words, i):
+        """
+        Tries the pattern at word i, whose first token is already known to match.
+        Returns (index of the last word, extra text matched after it, first word
+        a following match may start at), or None.
+        """
+        j = i
+        for alternatives in self.rest:
+            sep = pairs[j][1]
+            j += 1
+            if j == len(pairs) or not sep.isspace() or words[j] not in alternatives:
+                return None
+        if self.next_chars is None:
+            return j, '', j + 1
+        sep = pairs[j][1]
+        gap = len(sep) - len(sep.lstrip())
+        if not gap:
+            return None
+        if gap < len(sep):
+            next_char, resume = sep[gap], j + 1
+        elif j + 1 < len(pairs):
+            next_char, resume = pairs[j + 1][0][0], j + 2  # the next word's first letter is consumed
+        else:
+            return None
+        if (next_char in self.next_chars) == self.negated:
+            return None
+        return j, sep[:gap] + next_char, resume
+
+class RuleSet:
+    """A compiled set of rules, scanned over an essay in one pass."""
+
+    def __init__(self, rules, path=None):
+        self.path = path
+        self.rules = {}  # id -> Rule, in file order
+        self.index = {}  # folded first word -> [_Pattern], in file order
+        self.span = 0    # most words any pattern looks at past its first one
+        regexes = []
+        self.regex = None
+        for position, spec in enumerate(rules, 1):
+            if not isinstance(spec, dict) or not isinstance(spec.get("message"), str):
+                raise ValueError(f"rule {position}: expected an object with a 'message' string")
+            rule_id = str(spec.get("id", position))
+            if rule_id in self.rules:
+                raise ValueError(f"rule {rule_id}: duplicate id")
+            try:
+                if "patterns" in spec:
+                    rule = Rule(rule_id, spec["message"])
+                    for pattern in spec["patterns"]:
+                        self._add_pattern(_Pattern(rule, pattern["tokens"], pattern.get("next_char")))
+                elif "misspellings" in spec:
+                    corrections = {fold(word): correction for word, correction in spec["misspellings"].items()}
+                    rule = Rule(rule_id, spec["message"], corrections)
+                    for word in corrections:
+                        self._add_pattern(_Pattern(rule, [word]))
+                elif "regex" in spec:
+                    rule = Rule(rule_id, spec["message"])
+                    if any(not m.group() for m in re.finditer(spec["regex"], _EMPTY_MATCH_PROBE, re.IGNORECASE)):
+                        raise ValueError("regex can match empty text")
+                    regexes.append((rule, spec["regex"]))
+                    try:
+                        self.regex = re.compile('|'.join(f"(?P<_rule{n}>{regex})" for n, (_, regex) in enumerate(regexes)),
+                                                re.IGNORECASE)
+                    except re.error as e:
+                        raise ValueError(f"regex cannot be joined to the earlier regex rules ({e})") from e
+                else:
+                    raise ValueError("expected 'patterns', 'misspellings' or 'regex'")
+            except (KeyError, TypeError, AttributeError, re.error) as e:
+                raise ValueError(f"rule {rule_id}: invalid definition ({e!r})") from e
+            except ValueError as e:
+                raise ValueError(f"rule {rule_id}: {e}") from e
+            self.rules[rule_id] = rule
+        self.regex_rules = {f"_rule{n}": rule for n, (rule, _) in enumerate(regexes)}
+
+    def _add_pattern(self, pattern):
+        for word in pattern.tokens[0]:
+            self.index.setdefault(word, []).append(pattern)
+        self.span = max(self.span, len(pattern.tokens))
+
+    def scan(self, text, pairs, words):
+        """
+        Returns a GrammarMatch for every rule match in text. pairs are the
+        (word, separator) tuples of the text and words their folded forms.
+        """
+        return [match for _, _, match in self._match_tokens(text, pairs, words)] + self._match_regexes(text)
+
+    def _match_tokens(self, text, pairs, words, start=0, free=None, known=0, offset=None):
+        """
+        Yields (word index, first word the rule's next match may start at,
+        GrammarMatch) for each token pattern match from word start on. free maps
+        rules to the first word their next match may start at, and offset is
+        the character offset of word known, if already found.
+        """
+        index = self.index
+        free = {} if free is None else free
+        for i in compress(count(start), map(index.__contains__, islice(words, start, None))):
+            for pattern in index[words[i]]:
+                if i < free.get(pattern.rule, 0):
+                    continue
+                found = pattern.match(pairs, words, i)
+                if found is None:
+                    continue
+                j, tail, free[pattern.rule] = found
+                if offset is None:
+                    offset = re.search(r'\w', text).start()
+                offset += sum(map(len, chain.from_iterable(pairs[known:i])))
+                known = i
+                end = offset + sum(map(len, chain.from_iterable(pairs[i:j]))) + len(pairs[j][0]) + len(tail)
+                yield i, free[pattern.rule], GrammarMatch(pattern.rule.id, offset, end, text[offset:end])
+
+    def _match_regexes(self, text):
+        if self.regex is None:
+            return []
+        return [GrammarMatch(self.regex_rules[m.lastgroup].id, m.start(), m.end(), m.group()) for m in self.regex.finditer(text)]
+
+    def issues(self, matches):
+        """Returns the feedback messages for a scan's matches, in rule file order."""
+        by_rule = {}
+        for match in matches:
+            by_rule.setdefault(match.rule, []).append(match)
+        return [issue for rule_id, rule in self.rules.items() if rule_id in by_rule for issue in rule.issues(by_rule[rule_id])]
+
+class IncrementalScan:
+    """
+    Gives the same matches as rule_set.scan for successive versions of a text.
+    A token pattern match only depends on the words it looks at, so matches
+    whose patterns could not reach the first changed word are kept and the scan
+    resumes from there: typing near the end of a long essay rescans only its
+    last few words. Regex rules are rerun over the whole text.
+    """
+
+    def __init__(self, rule_set):
+        self.rule_set = rule_set
+        self.pairs = []    # the pairs of the last text scanned
+        self.first = None  # the character offset of its first word
+        self.found = []    # (word index, next free word, GrammarMatch) of its token pattern matches
+        self.starts = []   # the word index of each entry in found
+
+    def scan(self, text, pairs, words):
+        rule_set = self.rule_set
+        first = re.search(r'\w', text)
+        first = first and first.start()
+        changed = next(compress(count(), map(ne, self.pairs, pairs)), min(len(self.pairs), len(pairs)))
+        resume = max(changed - rule_set.span, 0) if first == self.first else 0
+        kept = bisect_left(self.starts, resume)
+        free = {rule_set.rules[match.rule]: next_free for _, next_free, match in self.found[:kept]}
+        known, offset = (self.starts[kept - 1], self.found[kept - 1][2].start) if kept else (0, None)
+        found = self.found[:kept]
+        found += rule_set._match_tokens(text, pairs, words, resume, free, known, offset)
+        self.pairs, self.first, self.found = pairs, first, found
+        self.starts = [i for i, _, _ in found]
+        return [match for _, _, match in found] + rule_set._match_regexes(text)
+
+def load_rules(path=DEFAULT_RULE_FILE):
+    """Loads and compiles a rule file. Raises ValueError describing the first invalid rule."""
+    import json  # only needed once, when the rules are first used
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("rules"), list):
+        raise ValueError(f"{path}: expected an object with a 'rules' list")
+    return RuleSet(data["rules"], path)
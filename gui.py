@@ -0,0 +1,472 @@
+"""Tkinter desktop app: prompts, essay scoring, live feedback and score history.
+
+Run through main.py; the scoring core and the command-line tools never import this module.
+"""
+import tkinter as tk
+from tkinter import messagebox, scrolledtext, ttk
+import os
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import ScoreCache
+from charts import CHART_HEIGHT, CHART_WIDTH, ChartView
+from analytics import ROLLING_WINDOWS
+from history import SCRIPT_DIR, adopt_legacy_history, current_user, format_record, legacy_history_exists, open_history
+from prompts import PromptSampler, default_bank
+from scoring import IncrementalAnalyzer, overall_score, score_submission
+
+HISTORY_PAGE_SIZE = 50  # attempts fetched per page of the Score History panel
+SCORE_CACHE_FILE = os.path.join(SCRIPT_DIR, "score_cache.json")
+SCORE_CACHE_SIZE = 256
+LIVE_SCORE_DELAY_MS = 300  # pause in typing before live mode rescores
+RESULT_POLL_MS = 16  # how often finished background scoring is applied (about one frame)
+
+# The app needs only the standard library and Tk, but reads its rules, phrases and prompts from
+# grammar_rules.json, cohesive_devices.json and prompt_bank/ next to it. NumPy and Pillow are only
+# used by tools: features.py and PNG chart export.
+
+def update_total_score(scores_dict, total_score_label, status_label):
+    """Updates the total score label based on the current scores in scores_dict."""
+    final_score = overall_score(scores_dict.get('task1', 0), scores_dict.get('task2', 0))
+
+    if final_score is not None:
+        total_score_label.config(text=f"Overall IELTS Score: {final_score:.1f} / 9.0")
+        status_label.config(text="👆 Preview score. Click 'Submit' below to record this attempt.", foreground="#007bff")
+    else:
+        total_score_label.config(text="Overall IELTS Score: N/A (Score both tasks to see total)")
+        status_label.config(text="")
+
+def display_results(result, result_widget):
+    """Updates the result widget with the scoring results."""
+    result_widget.config(state=tk.NORMAL)
+    result_widget.delete('1.0', tk.END)
+    result_widget.insert(tk.END, f"Overall Score: {result['score']:.1f}/9.0\n\n", "bold")
+    result_widget.insert(tk.END, "Reasons:\n", "bold")
+    for criterion, reason in result['reasons'].items():
+        result_widget.insert(tk.END, f"• {criterion.replace('_', ' ').title()}: {reason}\n")
+    result_widget.config(state=tk.DISABLED)
+
+SUMMARY_ROWS = len(ROLLING_WINDOWS) + 2  # rolling means, the trend over the longest window and the best attempt
+
+def refresh_history_summary(summary_tree, history_store):
+    """Refreshes the rows under the score history from the precomputed history analytics."""
+    summary_tree.delete(*summary_tree.get_children())
+    analytics = history_store.analytics
+    if not analytics.count:
+        return
+    scores = ("task1", "task2", "overall")
+    for window in ROLLING_WINDOWS:
+        means = analytics.rolling_mean(window)
+        summary_tree.insert("", tk.END, values=(f"Last {window} avg", *(f"{means[name]:.1f}" for name in scores)))
+    window = ROLLING_WINDOWS[-1]
+    trends = [analytics.trend(name, window) for name in scores]
+    summary_tree.insert("", tk.END, values=("Trend/attempt", *("-" if trend is None else f"{trend:+.2f}" for trend in trends)))
+    attempt, _ = analytics.best()
+    best = history_store.get(attempt)
+    summary_tree.insert("", tk.END, values=(f"Best (#{attempt})", *(f"{value:.1f}" for value in best[1:4])))
+
+def on_submit_final_score_click(scores_dict, total_score_label, score_history_tree, summary_tree, history_store, status_label):
+    """Handles the 'Submit Final Score' button click."""
+    task1_score = scores_dict.get('task1', 0)
+    task2_score = scores_dict.get('task2', 0)
+    final_score = overall_score(task1_score, task2_score)
+    
+    if final_score is not None:
+        bands = {task: scores_dict[f'task{task}_bands'] for task in (1, 2) if scores_dict.get(f'task{task}_bands')}
+        try:
+            attempt = history_store.append(task1_score, task2_score, final_score, bands=bands)
+        except sqlite3.OperationalError:  # another writer held the history past the busy timeout
+            status_label.config(text="⚠️ Score history is busy. Please submit again.", foreground="red")
+            status_label.after(3000, lambda: status_label.config(text=""))
+            return
+        new_record = format_record((attempt, task1_score, task2_score, final_score))
+        
+        score_history_tree.insert("", tk.END, values=new_record)
+        score_history_tree.yview_moveto(1)
+        refresh_history_summary(summary_tree, history_store)
+        
+        scores_dict.clear()
+        
+        update_total_score(scores_dict, total_score_label, status_label)
+        status_label.config(text="✅ Score recorded! Ready for next attempt.", foreground="green")
+        status_label.after(3000, lambda: status_label.config(text=""))
+    else:
+        status_label.config(text="⚠️ Please score both Task 1 and Task 2 first.", foreground="red")
+        status_label.after(3000, lambda: status_label.config(text=""))
+
+class BackgroundScorer:
+    """
+    Runs scoring jobs on a worker thread so the Tk main loop never waits for them.
+    Finished jobs are handed back through a queue drained with after(), because
+    widgets may only be touched from the main thread. A new job supersedes the
+    previous one: it is cancelled if it has not started, and its result is
+    dropped if it has. on_busy(True/False) is called when work starts and ends,
+    and on_error(exception) when the newest job fails.
+    """
+
+    def __init__(self, widget, on_busy=None, on_error=None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.finished = queue.Queue()
+        self.generation = 0
+        self.outstanding = 0
+        self.latest = None
+
+    def submit(self, func, args, on_result):
+        if self.latest is not None:
+            self.latest.cancel()
+        self.generation += 1
+        generation = self.generation
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda f: self.finished.put((generation, f, on_result)))
+        self.latest = future
+        self.outstanding += 1
+        if self.outstanding == 1:
+            if self.on_busy:
+                self.on_busy(True)
+            self.widget.after(RESULT_POLL_MS, self.poll)
+
+    def poll(self):
+        try:
+            while True:
+                try:
+                    generation, future, on_result = self.finished.get_nowait()
+                except queue.Empty:
+                    break
+                self.outstanding -= 1
+                if generation != self.generation:
+                    continue
+                self.latest = None
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(e)
+                    continue
+                on_result(result)
+        finally:
+            # Keep polling, or report idle, even if a result handler raised.
+            if self.outstanding:
+                self.widget.after(RESULT_POLL_MS, self.poll)
+            elif self.on_busy:
+                self.on_busy(False)
+
+def apply_score_result(result, result_widget, task_type, scores_dict, total_score_label, status_label):
+    """Shows a scoring result and feeds its band into the overall score."""
+    display_results(result, result_widget)
+
+    if result['score'] > 0:
+        scores_dict[f'task{task_type}'] = result['score']
+        scores_dict[f'task{task_type}_bands'] = result.get('bands')
+        update_total_score(scores_dict, total_score_label, status_label)
+
+def on_score_button_click(essay_widget, result_widget, task_type, scores_dict, total_score_label, status_label, score_cache, scorer):
+    """Handles the score button click event by scoring the essay in the background."""
+    essay = essay_widget.get('1.0', tk.END)
+    scorer.submit(score_cache.score, (essay, task_type), lambda result: apply_score_result(result, result_widget, task_type, scores_dict, total_score_label, status_label))
+
+def populate_task_tab(parent_tab, task_number, prompt_bank, scores_dict, total_score_label, status_label, score_cache):
+    """Populates a tab with the widgets for a single essay task."""
+    parent_tab.columnconfigure(0, weight=1)
+    parent_tab.rowconfigure(4, weight=2)
+    parent_tab.rowconfigure(6, weight=1)
+
+    # --- Prompt Section ---
+    prompt_frame = ttk.Frame(parent_tab)
+    prompt_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+    prompt_frame.columnconfigure(0, weight=1)
+    
+    prompt_title = ttk.Label(prompt_frame, text=f"IELTS Writing Task {task_number}", style="Title.TLabel")
+    prompt_title.grid(row=0, column=0, sticky="w")
+    
+    prompt_text_label = ttk.Label(prompt_frame, text="Click 'New Prompt' to begin.", wraplength=480, justify=tk.CENTER, font=("Helvetica", 10))
+
+    canvas = tk.Canvas(prompt_frame, width=CHART_WIDTH, height=CHART_HEIGHT, bg="#ffffff", relief=tk.SUNKEN, borderwidth=1)
+    chart_view = ChartView(canvas)  # each chart is drawn once, then shown and hidden by tag
+    if task_number == 1:
+        canvas.grid(row=1, column=0, pady=(5, 0), columnspan=3)
+        prompt_text_label.grid(row=2, column=0, pady=(5, 0), columnspan=3)
+    else:  # Task 2 has no canvas
+        prompt_text_label.grid(row=1, column=0, sticky="ew", pady=(5, 0), columnspan=3)
+
+    # Prompts are drawn from the on-disk bank without repeats for this session.
+    any_topic = "Any topic"
+    topic_var = tk.StringVar(value=any_topic)
+    sampler = [PromptSampler(prompt_bank, task_number)]
+
+    def on_topic_selected(event):
+        topic = topic_var.get()
+        sampler[0] = PromptSampler(prompt_bank, task_number, topic=None if topic == any_topic else topic)
+
+    def get_new_prompt():
+        prompt = sampler[0].draw()
+        if prompt is None:
+            return
+        prompt_text_label.config(text=prompt["text"])
+        if task_number == 1:
+            chart_view.show(prompt["id"])
+
+    topic_box = ttk.Combobox(prompt_frame, textvariable=topic_var, values=[any_topic, *prompt_bank.topics(task_number)], state="readonly", width=16)
+    topic_box.grid(row=0, column=1, sticky="e", padx=(10, 0))
+    topic_box.bind("<<ComboboxSelected>>", on_topic_selected)
+    new_prompt_button = ttk.Button(prompt_frame, text="New Prompt", command=get_new_prompt)
+    new_prompt_button.grid(row=0, column=2, sticky="e", padx=(10, 0))
+
+    # --- Input & Result Sections ---
+    essay_text = scrolledtext.ScrolledText(parent_tab, wrap=tk.WORD, height=10, font=("Helvetica", 11), relief=tk.SOLID, borderwidth=1)
+    essay_text.grid(row=4, column=0, sticky="nsew", pady=(10,0))
+    
+    action_frame = ttk.Frame(parent_tab)
+    action_frame.grid(row=5, column=0, pady=15)
+
+    score_button = ttk.Button(action_frame, text=f"Score Task {task_number} Essay", style="Accent.TButton", command=lambda: on_score_button_click(essay_text, result_text, task_number, scores_dict, total_score_label, status_label, score_cache, scorer))
+    score_button.pack(side=tk.LEFT)
+
+    # Scoring runs on a background thread; the progress bar shows while it is busy.
+    progress = ttk.Progressbar(action_frame, mode="indeterminate", length=120)
+
+    def on_scoring_busy(busy):
+        if busy:
+            progress.pack(side=tk.LEFT, padx=(15, 0))
+            progress.start(15)
+        else:
+            progress.stop()
+            progress.pack_forget()
+
+    def on_scoring_error(error):
+        status_label.config(text=f"⚠️ Scoring failed: {error}", foreground="red")
+        status_label.after(5000, lambda: status_label.config(text=""))
+
+    scorer = BackgroundScorer(parent_tab, on_busy=on_scoring_busy, on_error=on_scoring_error)
+    
+    result_text = scrolledtext.ScrolledText(parent_tab, wrap=tk.WORD, height=8, font=("Helvetica", 11), relief=tk.SOLID, borderwidth=1, state=tk.DISABLED, bg="#ffffff")
+    result_text.grid(row=6, column=0, sticky="nsew")
+    result_text.tag_configure("bold", font=("Helvetica", 11, "bold"))
+
+    # --- Live Scoring ---
+    # While enabled, the essay is rescored after each pause in typing. The
+    # IncrementalAnalyzer only rescans paragraphs the edit touched, and the
+    # work shares the tab's BackgroundScorer, off the Tk main loop.
+    live_enabled = tk.BooleanVar(value=False)
+    live_analyzer = IncrementalAnalyzer()
+    live_job = [None]  # pending after() id of the debounced rescore
+
+    def score_live(essay):
+        return score_submission(live_analyzer.analyze(essay), task_number)
+
+    def run_live_score():
+        live_job[0] = None
+        scorer.submit(score_live, (essay_text.get('1.0', tk.END),), lambda result: apply_score_result(result, result_text, task_number, scores_dict, total_score_label, status_label))
+
+    def on_essay_modified(event):
+        if not essay_text.edit_modified():
+            return  # the event edit_modified(False) below raises in turn
+        essay_text.edit_modified(False)
+        if not live_enabled.get():
+            return
+        if live_job[0] is not None:
+            essay_text.after_cancel(live_job[0])
+        live_job[0] = essay_text.after(LIVE_SCORE_DELAY_MS, run_live_score)
+
+    def on_live_toggled():
+        if live_job[0] is not None:
+            essay_text.after_cancel(live_job[0])
+            live_job[0] = None
+        if live_enabled.get():
+            run_live_score()
+
+    essay_text.bind("<<Modified>>", on_essay_modified)
+    live_check = ttk.Checkbutton(action_frame, text="Live scoring", variable=live_enabled, command=on_live_toggled)
+    live_check.pack(side=tk.LEFT, padx=(15, 0))
+
+def create_gui():
+    """Creates and runs the main GUI for the application."""
+    window = tk.Tk()
+    window.title("IELTS Essay Scorer")
+    try:
+        window.state('zoomed')
+    except tk.TclError:
+        # Fallback for some systems that don't support 'zoomed'
+        window.attributes('-zoomed', True)
+    window.minsize(1024, 700)
+    
+    style = ttk.Style(window)
+    style.theme_use('clam')
+    
+    BG_COLOR, TEXT_COLOR, BUTTON_COLOR, BUTTON_HOVER_COLOR = "#f0f2f5", "#333333", "#007bff", "#0056b3"
+    
+    window.configure(bg=BG_COLOR)
+    
+    style.configure("TFrame", background=BG_COLOR)
+    style.configure("TLabel", background=BG_COLOR, foreground=TEXT_COLOR, font=("Helvetica", 11))
+    style.configure("Title.TLabel", font=("Helvetica", 14, "bold"))
+    style.configure("TotalScore.TLabel", font=("Helvetica", 16, "bold"), padding=(0, 10, 0, 10))
+    style.configure("Accent.TButton", font=("Helvetica", 12, "bold"), padding=(10, 5))
+    style.map("Accent.TButton", background=[('active', BUTTON_HOVER_COLOR), ('!disabled', BUTTON_COLOR)], foreground=[('!disabled', 'white')])
+    style.configure("Treeview.Heading", font=("Helvetica", 11, "bold"))
+    style.configure("Status.TLabel", font=("Helvetica", 10, "italic"), anchor=tk.CENTER)
+    style.configure("TNotebook.Tab", font=("Helvetica", 11, "bold"), padding=[10, 5])
+
+    # --- Score History Data ---
+    user = current_user()
+    history_store = open_history(user)
+    try:
+        adopt_legacy_history(history_store)  # a single-user upgrade keeps its history
+    except (OSError, ValueError, sqlite3.Error):
+        pass  # the files stay in place; ask_to_import_legacy_history reports them
+    score_cache = ScoreCache(SCORE_CACHE_SIZE, SCORE_CACHE_FILE)
+
+    # --- Main layout frames ---
+    top_frame = ttk.Frame(window)
+    top_frame.pack(fill=tk.X)
+
+    main_app_frame = ttk.Frame(window)
+    main_app_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    history_frame = ttk.Frame(window, width=350)
+    history_frame.pack(side=tk.RIGHT, fill=tk.Y, expand=False, padx=(10,10), pady=(10,10))
+    history_frame.pack_propagate(False) # Prevent resizing
+
+    # --- Toggle History Button ---
+    history_visible = tk.BooleanVar(value=True)
+    def toggle_history():
+        if history_visible.get():
+            history_frame.pack_forget()
+            history_visible.set(False)
+        else:
+            history_frame.pack(side=tk.RIGHT, fill=tk.Y, expand=False, padx=(10,10), pady=(10,10))
+            history_visible.set(True)
+
+    # --- Total Score Display ---
+    scores_dict = {'task1': 0, 'task2': 0}
+    total_score_frame = ttk.Frame(top_frame)
+    total_score_frame.pack(fill=tk.X, pady=(5,0), expand=True)
+    total_score_label = ttk.Label(total_score_frame, text="Overall IELTS Score: N/A (Score both tasks to see total)", style="TotalScore.TLabel", anchor=tk.CENTER)
+    total_score_label.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(120,0)) # Pad to center roughly
+    
+    toggle_button = ttk.Button(total_score_frame, text="Toggle History", command=toggle_history)
+    toggle_button.pack(side=tk.RIGHT, padx=20)
+
+    status_label = ttk.Label(top_frame, text="", style="Status.TLabel")
+    status_label.pack(fill=tk.X, expand=True)
+
+    # --- Score History Panel ---
+    history_label = ttk.Label(history_frame, text=f"Score History: {user}", style="Title.TLabel")
+    history_label.pack(pady=5)
+
+    tree_frame = ttk.Frame(history_frame)
+    tree_frame.pack(fill=tk.BOTH, expand=True, pady=(5,0))
+
+    columns = ("attempt", "task1", "task2", "overall")
+    score_history_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+    
+    scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=score_history_tree.yview)
+
+    score_history_tree.heading("attempt", text="Attempt")
+    score_history_tree.heading("task1", text="Task 1")
+    score_history_tree.heading("task2", text="Task 2")
+    score_history_tree.heading("overall", text="Overall")
+    score_history_tree.column("attempt", width=90, anchor=tk.CENTER, stretch=tk.YES)
+    score_history_tree.column("task1", width=75, anchor=tk.CENTER)
+    score_history_tree.column("task2", width=75, anchor=tk.CENTER)
+    score_history_tree.column("overall", width=90, anchor=tk.CENTER)
+    
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    score_history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    # Only the newest page of attempts is loaded up front; older pages are
+    # fetched when the list is scrolled to the top, so startup cost does not
+    # grow with the number of stored attempts.
+    history_paging = {'oldest': None, 'exhausted': False, 'pending': False}
+
+    def load_older_history(keep_position=False):
+        history_paging['pending'] = False
+        rows = history_store.records(limit=HISTORY_PAGE_SIZE, before=history_paging['oldest'])
+        history_paging['exhausted'] = len(rows) < HISTORY_PAGE_SIZE
+        if not rows:
+            return
+        history_paging['oldest'] = rows[0][0]
+        for index, record in enumerate(rows):
+            score_history_tree.insert("", index, values=format_record(record))
+        if keep_position:
+            # Keep the previously top row in place instead of jumping to the new page.
+            score_history_tree.yview_moveto(len(rows) / len(score_history_tree.get_children()))
+        else:
+            score_history_tree.yview_moveto(1)
+
+    def on_history_scroll(first, last):
+        scrollbar.set(first, last)
+        # Reaching the top, or a page too short to scroll, pulls in the next older page.
+        if float(first) <= 0 and score_history_tree.winfo_ismapped() and not history_paging['exhausted'] and not history_paging['pending']:
+            history_paging['pending'] = True
+            score_history_tree.after_idle(load_older_history, float(last) < 1)
+
+    score_history_tree.configure(yscrollcommand=on_history_scroll)
+    load_older_history()
+
+    summary_tree = ttk.Treeview(history_frame, columns=columns, show="", height=SUMMARY_ROWS, selectmode="none")
+    for column, width in zip(columns, (90, 75, 75, 90)):
+        summary_tree.column(column, width=width, anchor=tk.CENTER)
+    summary_tree.pack(fill=tk.X, pady=(5,0))
+    refresh_history_summary(summary_tree, history_store)
+
+    def ask_to_import_legacy_history():
+        """Asks once per start whether a legacy history nobody has claimed belongs to this user."""
+        if not legacy_history_exists():
+            return
+        if not messagebox.askyesno("Older score history found",
+                                   "A score history from an earlier version of this app was found, shared by everyone on this computer.\n\n"
+                                   f"Import it into the history of {user}?", parent=window):
+            return
+        try:
+            imported = history_store.import_legacy()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            messagebox.showwarning("Older score history not imported",
+                                   f"{e}\n\nThe files were left in place. Import them into another user's history with:\n"
+                                   f"python main.py history --migrate-to NAME", parent=window)
+            return
+        score_history_tree.delete(*score_history_tree.get_children())
+        history_paging.update(oldest=None, exhausted=False, pending=False)
+        load_older_history()
+        refresh_history_summary(summary_tree, history_store)
+        status_label.config(text=f"✅ Imported {imported} earlier attempts.", foreground="green")
+        status_label.after(5000, lambda: status_label.config(text=""))
+
+    window.after_idle(ask_to_import_legacy_history)
+
+    # --- Main Task Panes ---
+    # Create a Notebook (tabbed view)
+    notebook = ttk.Notebook(main_app_frame)
+    notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+    task1_tab = ttk.Frame(notebook, padding=10)
+    task2_tab = ttk.Frame(notebook, padding=10)
+
+    notebook.add(task1_tab, text="IELTS Writing Task 1")
+    notebook.add(task2_tab, text="IELTS Writing Task 2")
+
+    prompt_bank = default_bank()
+    if prompt_bank.errors:
+        status_label.config(text=f"⚠️ Skipped {len(prompt_bank.errors)} prompt file(s): {prompt_bank.errors[0]}", foreground="red")
+        status_label.after(10000, lambda: status_label.config(text=""))
+    populate_task_tab(task1_tab, 1, prompt_bank, scores_dict, total_score_label, status_label, score_cache)
+    populate_task_tab(task2_tab, 2, prompt_bank, scores_dict, total_score_label, status_label, score_cache)
+
+    # --- Submit Button ---
+    submit_frame = ttk.Frame(main_app_frame)
+    submit_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=10)
+    submit_button = ttk.Button(submit_frame, text="Submit for Final Score & Record", style="Accent.TButton", command=lambda: on_submit_final_score_click(scores_dict, total_score_label, score_history_tree, summary_tree, history_store, status_label))
+    submit_button.pack()
+
+    def on_close():
+        score_cache.save()
+        window.destroy()
+    window.protocol("WM_DELETE_WINDOW", on_close)
+
+    window.mainloop()
+
+if __name__ == "__main__":
+    create_gui()
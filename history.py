@@ -0,0 +1,357 @@
+"""Score history storage backed by SQLite, one database per user.
+
+Usage: python main.py history --migrate-to USER [--dir DIR]
+
+Each user's (or candidate's) attempts live in their own partition,
+score_history/<user>.db, so students sharing a machine never wait on each
+other's writes. Every partition runs in WAL mode: readers never block, and
+concurrent writers to the same partition, such as two app instances or a
+batch run, queue on SQLite's lock (waiting up to BUSY_TIMEOUT seconds)
+instead of overwriting each other. Writes take that lock at the start of
+their transaction, and append_many() records a batch of attempts in one
+commit.
+
+Each submit is a single indexed INSERT, so recording an attempt no longer
+rewrites the whole history, and an interrupted write cannot corrupt earlier
+attempts. The legacy single-user score_history.db and score_history.json
+are imported automatically on a single-user upgrade, into the first
+partition of an otherwise empty history directory. Otherwise they are only
+imported into a partition chosen explicitly: with
+`main.py history --migrate-to USER`, by the app when $IELTS_USER names its
+user, or when the app's user agrees to it. Each file is claimed with an atomic rename first, so only one
+process imports it. Legacy attempts keep their numbers and order, so they
+are only imported into an empty partition.
+
+Scores are stored as numbers, with the criterion bands of each task in a
+side table. The HistoryAnalytics aggregates are updated with every append
+and saved alongside, so opening a long history replays only the attempts
+its saved aggregates have not seen.
+"""
+import getpass
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from analytics import ROLLING_WINDOWS, HistoryAnalytics
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DIR = os.path.join(SCRIPT_DIR, "score_history")  # one database per user
+HISTORY_FILE = os.path.join(SCRIPT_DIR, "score_history.json")  # legacy format, migrated on first use
+HISTORY_DB = os.path.join(SCRIPT_DIR, "score_history.db")  # legacy single-user database, migrated on first use
+BUSY_TIMEOUT = 30  # seconds a write waits for another writer of the same partition
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt INTEGER PRIMARY KEY,
+    task1 REAL NOT NULL,
+    task2 REAL NOT NULL,
+    overall REAL NOT NULL,
+    recorded_at REAL
+);
+CREATE INDEX IF NOT EXISTS attempts_recorded_at ON attempts (recorded_at);
+CREATE TABLE IF NOT EXISTS bands (
+    attempt INTEGER NOT NULL,
+    task INTEGER NOT NULL,
+    criterion TEXT NOT NULL,
+    band REAL NOT NULL,
+    PRIMARY KEY (attempt, task, criterion)
+);
+CREATE TABLE IF NOT EXISTS analytics (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    state TEXT NOT NULL
+);
+"""
+
+def format_record(row):
+    """Formats an (attempt, task1, task2, overall) row the way the history table shows it."""
+    attempt, task1, task2, overall = row[:4]
+    return (f"Attempt {attempt}", f"{task1:.1f}", f"{task2:.1f}", f"{overall:.1f}")
+
+def current_user():
+    """Returns the user whose history the app shows: $IELTS_USER, else the login name."""
+    user = os.environ.get("IELTS_USER")
+    if not user:
+        try:
+            user = getpass.getuser()
+        except (KeyError, OSError):  # no login name, e.g. in some containers
+            user = "default"
+    return user
+
+def user_history_path(user, directory=HISTORY_DIR):
+    """
+    Returns the partition file of a user or candidate id. Ids are compared
+    case-insensitively, since some file systems are, and any character that
+    is not a letter, digit, '-' or '_' is escaped in the file name.
+    """
+    user = user.strip().casefold()
+    if not user:
+        raise ValueError("user id must not be empty")
+    return os.path.join(directory, quote(user, safe='') + ".db")
+
+def open_history(user=None, directory=HISTORY_DIR, windows=ROLLING_WINDOWS):
+    """Opens the history partition of a user (default: current_user()), creating it on first use."""
+    os.makedirs(directory, exist_ok=True)
+    return HistoryStore(user_history_path(user or current_user(), directory), windows=windows)
+
+def legacy_history_exists(legacy_db=HISTORY_DB, legacy_file=HISTORY_FILE):
+    """Returns True while a legacy single-user history is waiting to be imported."""
+    return os.path.exists(legacy_db) or os.path.exists(legacy_file)
+
+def adopt_legacy_history(store, directory=HISTORY_DIR, legacy_db=HISTORY_DB, legacy_file=HISTORY_FILE):
+    """
+    Imports the legacy single-user history into store on a single-user upgrade,
+    i.e. when store is empty and no other partition exists in directory yet.
+    Returns the number of attempts imported, 0 when it is not such an upgrade.
+    """
+    if not legacy_history_exists(legacy_db, legacy_file) or store.count():
+        return 0
+    own = os.path.basename(store.path)
+    if any(name.endswith(".db") and name != own for name in os.listdir(directory)):
+        return 0  # other users already have histories here, so the legacy owner is unknown
+    return store.import_legacy(legacy_db, legacy_file)
+
+def _claim(path):
+    """Atomically renames a legacy file out of the way, returning its new path, or None if another process took it."""
+    claimed = f"{path}.migrating-{os.getpid()}"
+    try:
+        os.rename(path, claimed)
+    except OSError:
+        return None
+    return claimed
+
+def _read_legacy_json(path):
+    """Returns (attempt, task1, task2, overall) rows from a score_history.json list of string tuples, or None if unreadable."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+        return None
+    rows = []
+    next_attempt = 1
+    for record in data if isinstance(data, list) else []:
+        try:
+            label, task1, task2, overall = record
+            match = re.search(r'\d+', str(label))
+            attempt = int(match.group()) if match else next_attempt
+            rows.append((attempt, float(task1), float(task2), float(overall)))
+        except (TypeError, ValueError):
+            continue
+        next_attempt = max(next_attempt, attempt + 1)
+    return rows
+
+class HistoryStore:
+    """Indexed, append-only store of one user's submitted attempts."""
+
+    def __init__(self, path, windows=ROLLING_WINDOWS):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)  # transactions are explicit
+        self.conn.execute("PRAGMA journal_mode=WAL")  # stays in the default mode where WAL is unsupported
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # in WAL mode, still safe from corruption
+        self.conn.executescript(_SCHEMA)
+        self.analytics = self._load_analytics(windows)
+
+    def import_legacy(self, legacy_db=HISTORY_DB, legacy_file=HISTORY_FILE):
+        """
+        Imports the legacy single-user history into this partition and returns
+        the number of attempts imported: 0 if there is none, or another process
+        claimed it first. Legacy attempts keep their numbers and order, so the
+        partition must still be empty; otherwise ValueError is raised and the
+        legacy files are left in place, as they are if the import fails.
+        """
+        candidates = [legacy_db] if os.path.abspath(legacy_db) != os.path.abspath(self.path) else []
+        claims = {path: _claim(path) for path in candidates + [legacy_file] if os.path.exists(path)}
+        claims = {path: claimed for path, claimed in claims.items() if claimed is not None}
+        if not claims:
+            return 0
+        imported = False
+        try:
+            rows = []
+            if legacy_file in claims:
+                rows = _read_legacy_json(claims[legacy_file])
+                if rows is None:  # leave an unreadable file where it was
+                    os.replace(claims.pop(legacy_file), legacy_file)
+                    rows = []
+            if legacy_db in claims:
+                self.conn.execute("ATTACH DATABASE ? AS legacy", (claims[legacy_db],))
+            try:
+                with self._transaction():
+                    if self.count():
+                        raise ValueError(f"{self.path} already has attempts; the legacy history is only imported into an empty history")
+                    if legacy_db in claims:
+                        self.conn.execute("INSERT INTO attempts SELECT attempt, task1, task2, overall, recorded_at FROM legacy.attempts")
+                        if self.conn.execute("SELECT 1 FROM legacy.sqlite_master WHERE name = 'bands'").fetchone():
+                            self.conn.execute("INSERT INTO bands SELECT attempt, task, criterion, band FROM legacy.bands")
+                    self.conn.executemany("INSERT OR IGNORE INTO attempts (attempt, task1, task2, overall) VALUES (?, ?, ?, ?)", rows)
+            finally:
+                if legacy_db in claims:
+                    self.conn.execute("DETACH DATABASE legacy")
+            imported = True
+        finally:
+            for path, claimed in claims.items():
+                os.replace(claimed, path + ".migrated" if imported else path)  # never leave a claim file behind
+        self.analytics = self._load_analytics(self.analytics.windows)
+        return self.count()
+
+    @contextmanager
+    def _transaction(self):
+        """Runs a write transaction that holds the partition's write lock from the start."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _load_analytics(self, windows):
+        """Restores the saved aggregates, replaying attempts added since; rebuilds them if the snapshot does not fit."""
+        with self._transaction():
+            row = self.conn.execute("SELECT state FROM analytics").fetchone()
+            analytics = None
+            if row is not None:
+                try:
+                    analytics = HistoryAnalytics.from_json(row[0], windows)
+                except ValueError:
+                    pass
+            if analytics is not None and analytics.count != self.conn.execute(
+                    "SELECT COUNT(*) FROM attempts WHERE attempt <= ?", (analytics.last_attempt or 0,)).fetchone()[0]:
+                analytics = None  # attempts were inserted behind the snapshot, e.g. by a migration
+            if analytics is None:
+                analytics = HistoryAnalytics(windows)
+            seen = analytics.count
+            self._catch_up(analytics)
+            if row is None or analytics.count != seen:
+                self._save_analytics(analytics)
+        return analytics
+
+    def _catch_up(self, analytics):
+        """Folds attempts recorded after the analytics' last attempt, e.g. by another process, into them."""
+        for attempt, scores in self._attempt_scores(after=analytics.last_attempt or 0):
+            analytics.add(attempt, scores)
+
+    def _save_analytics(self, analytics):
+        self.conn.execute("INSERT OR REPLACE INTO analytics (id, state) VALUES (1, ?)", (analytics.to_json(),))
+
+    def _attempt_scores(self, after=0):
+        """Yields (attempt, {score name: band}) for attempts after the given number, in order, criterion bands included."""
+        bands = self.conn.execute("SELECT attempt, task, criterion, band FROM bands WHERE attempt > ? ORDER BY attempt", (after,))
+        band = next(bands, None)
+        for attempt, task1, task2, overall in self.conn.execute(
+                "SELECT attempt, task1, task2, overall FROM attempts WHERE attempt > ? ORDER BY attempt", (after,)):
+            scores = {"task1": task1, "task2": task2, "overall": overall}
+            while band is not None and band[0] <= attempt:
+                if band[0] == attempt:
+                    scores[f"task{band[1]}:{band[2]}"] = band[3]
+                band = next(bands, None)
+            yield attempt, scores
+
+    def append(self, task1, task2, overall, recorded_at=None, bands=None):
+        """
+        Records one attempt and returns its attempt number. bands optionally
+        maps each task number to its {criterion: band}. The analytics are
+        updated in the same transaction.
+        """
+        return self.append_many([(task1, task2, overall, recorded_at, bands)])[0]
+
+    def append_many(self, attempts):
+        """
+        Records (task1, task2, overall[, recorded_at[, bands]]) tuples in one
+        transaction and returns their attempt numbers. Attempts recorded
+        meanwhile by other processes are folded into the analytics first.
+        """
+        numbers = []
+        with self._transaction():
+            # The write lock is held from here, so no other writer can slip in between catching up and saving.
+            if self.conn.execute("SELECT MAX(attempt) FROM attempts").fetchone()[0] != self.analytics.last_attempt:
+                self._catch_up(self.analytics)
+            before = self.analytics.to_json()
+            try:
+                for task1, task2, overall, *optional in attempts:
+                    recorded_at, bands = (optional + [None, None])[:2]
+                    cursor = self.conn.execute(
+                        "INSERT INTO attempts (task1, task2, overall, recorded_at) VALUES (?, ?, ?, ?)",
+                        (task1, task2, overall, time.time() if recorded_at is None else recorded_at))
+                    attempt = cursor.lastrowid
+                    rows = [(attempt, task, criterion, band) for task, criteria in (bands or {}).items() for criterion, band in criteria.items()]
+                    self.conn.executemany("INSERT INTO bands VALUES (?, ?, ?, ?)", rows)
+                    scores = {"task1": task1, "task2": task2, "overall": overall}
+                    scores.update((f"task{task}:{criterion}", band) for _, task, criterion, band in rows)
+                    self.analytics.add(attempt, scores)
+                    numbers.append(attempt)
+                self._save_analytics(self.analytics)
+            except BaseException:
+                self.analytics = HistoryAnalytics.from_json(before, self.analytics.windows)  # drop the rolled-back attempts
+                raise
+        return numbers
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+
+    def get(self, attempt):
+        """Returns the (attempt, task1, task2, overall, recorded_at) row for an attempt number, or None."""
+        return self.conn.execute("SELECT * FROM attempts WHERE attempt = ?", (attempt,)).fetchone()
+
+    def records(self, limit=None, before=None):
+        """
+        Returns attempts in ascending order. With limit, only the newest `limit`
+        attempts (older than attempt number `before`, if given) are returned.
+        """
+        query, params = "SELECT * FROM attempts", []
+        if before is not None:
+            query += " WHERE attempt < ?"
+            params.append(before)
+        if limit is None:
+            return self.conn.execute(query + " ORDER BY attempt", params).fetchall()
+        rows = self.conn.execute(query + " ORDER BY attempt DESC LIMIT ?", params + [limit]).fetchall()
+        return rows[::-1]
+
+    def rolling_average(self, window):
+        """Returns the mean (task1, task2, overall) of the newest `window` attempts, or None if there are none."""
+        row = self.conn.execute(
+            "SELECT AVG(task1), AVG(task2), AVG(overall), COUNT(*) FROM"
+            " (SELECT task1, task2, overall FROM attempts ORDER BY attempt DESC LIMIT ?)",
+            (window,)).fetchone()
+        return row[:3] if row[3] else None
+
+    def between(self, start, end):
+        """Returns attempts recorded in the [start, end) time range, oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM attempts WHERE recorded_at >= ? AND recorded_at < ? ORDER BY recorded_at",
+            (start, end)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="main.py history", description="Manage the per-user score histories.")
+    parser.add_argument("--migrate-to", metavar="USER", required=True,
+                        help="import the legacy single-user score_history.db/.json into USER's history")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="directory of the per-user histories (default: score_history next to the app)")
+    args = parser.parse_args(argv)
+    if not legacy_history_exists():
+        print("history: no legacy score history to import.", file=sys.stderr)
+        return 0
+    try:
+        store = open_history(args.migrate_to, args.dir)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"history: {e}", file=sys.stderr)
+        return 1
+    try:
+        imported = store.import_legacy()
+    except (ValueError, sqlite3.Error) as e:
+        print(f"history: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    print(f"history: imported {imported} attempts into {store.path}.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
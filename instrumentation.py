@@ -0,0 +1,213 @@
+"""Optional per-criterion timing and profiling for the scoring pipeline.
+
+enable() swaps timed wrappers for score_essay, analyze_essay and each assess_*
+function into the scoring module; disable() puts the originals back. While
+disabled nothing is wrapped, so scoring pays no overhead at all.
+
+Every call records its wall time and input size (characters of essay text)
+in a MetricsRegistry, which exports as JSON or Prometheus text. With
+profile_slowest=N, each score_essay call also runs under cProfile and the
+profiles of the N slowest essays are kept.
+
+Pool workers have their own registry: start them with init_worker and score
+through call_and_drain, then merge() the returned data into the parent's.
+"""
+import heapq
+import itertools
+import json
+import threading
+import time
+from functools import wraps
+
+import scoring
+
+INSTRUMENTED = [
+    "analyze_essay",
+    "score_essay",
+    "assess_grammatical_range_and_accuracy",
+    "assess_lexical_resource",
+    "assess_task_1_response",
+    "assess_task_2_response",
+    "assess_coherence_and_cohesion",
+]
+PROFILE_LINES = 25  # functions listed per captured profile
+
+_originals = {}
+_active = None
+_profile_lock = threading.Lock()  # only one cProfile can run at a time
+_sequence = itertools.count()  # tie-breaker for equally slow profiles
+
+def _input_chars(essay_text):
+    return len(essay_text.text if isinstance(essay_text, scoring.EssayAnalysis) else essay_text)
+
+class MetricsRegistry:
+    """Thread-safe per-stage call counts, wall times and input sizes."""
+
+    def __init__(self, profile_slowest=0):
+        self.profile_slowest = profile_slowest
+        self.lock = threading.Lock()
+        self.stages = {}  # name -> [calls, seconds_total, seconds_max, input_chars_total]
+        self.profiles = []  # min-heap of (seconds, sequence, chars, profile text)
+
+    def record(self, name, seconds, chars):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                self.stages[name] = [1, seconds, seconds, chars]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+                stage[3] += chars
+
+    def wants_profile(self, seconds):
+        """Returns True if an essay this slow would be among the kept profiles."""
+        with self.lock:
+            return len(self.profiles) < self.profile_slowest or seconds > self.profiles[0][0]
+
+    def add_profile(self, seconds, chars, text):
+        with self.lock:
+            self._keep_profile((seconds, next(_sequence), chars, text))
+
+    def _keep_profile(self, entry):
+        if len(self.profiles) < self.profile_slowest:
+            heapq.heappush(self.profiles, entry)
+        elif self.profiles and entry[0] > self.profiles[0][0]:
+            heapq.heapreplace(self.profiles, entry)
+
+    def drain(self):
+        """Returns the raw counters and profiles, then resets them."""
+        with self.lock:
+            data = {"stages": self.stages, "profiles": [(seconds, chars, text) for seconds, _, chars, text in self.profiles]}
+            self.stages, self.profiles = {}, []
+        return data
+
+    def merge(self, data):
+        """Adds the counters and profiles drained from another registry."""
+        with self.lock:
+            for name, (calls, total, longest, chars) in data["stages"].items():
+                stage = self.stages.get(name)
+                if stage is None:
+                    self.stages[name] = [calls, total, longest, chars]
+                else:
+                    stage[0] += calls
+                    stage[1] += total
+                    stage[2] = max(stage[2], longest)
+                    stage[3] += chars
+            for seconds, chars, text in data["profiles"]:
+                self._keep_profile((seconds, next(_sequence), chars, text))
+
+    def snapshot(self):
+        """Returns {stage: {calls, seconds_total, mean_ms, max_ms, input_chars_total}}, slowest total first."""
+        with self.lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {
+                "calls": calls,
+                "seconds_total": round(total, 6),
+                "mean_ms": round(total / calls * 1000, 4),
+                "max_ms": round(longest * 1000, 4),
+                "input_chars_total": chars,
+            }
+            for name, (calls, total, longest, chars) in stages
+        }
+
+    def slowest_profiles(self):
+        """Returns the kept profiles as [{seconds, input_chars, profile}], slowest first."""
+        with self.lock:
+            profiles = sorted(self.profiles, reverse=True)
+        return [{"seconds": round(seconds, 6), "input_chars": chars, "profile": text} for seconds, _, chars, text in profiles]
+
+    def to_json(self):
+        return json.dumps({"stages": self.snapshot(), "slowest_profiles": self.slowest_profiles()}, indent=4)
+
+    def to_prometheus(self, prefix="ielts_scoring"):
+        """Returns the counters in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        metrics = [
+            ("calls_total", "counter", "Calls per scoring stage.", lambda s: s["calls"]),
+            ("seconds_total", "counter", "Wall time spent per scoring stage.", lambda s: s["seconds_total"]),
+            ("seconds_max", "gauge", "Slowest single call per scoring stage.", lambda s: round(s["max_ms"] / 1000, 7)),
+            ("input_chars_total", "counter", "Essay characters passed to each scoring stage.", lambda s: s["input_chars_total"]),
+        ]
+        lines = []
+        for suffix, kind, help_text, value in metrics:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+            for name, stats in snapshot.items():
+                lines.append(f'{prefix}_{suffix}{{stage="{name}"}} {value(stats)}')
+        return "\n".join(lines) + "\n"
+
+def _timed(name, func, registry):
+    skip_analyses = name == "analyze_essay"  # passing an existing analysis through is not an analysis
+
+    @wraps(func)
+    def wrapper(essay_text, *args):
+        if skip_analyses and isinstance(essay_text, scoring.EssayAnalysis):
+            return essay_text
+        start = time.perf_counter()
+        try:
+            return func(essay_text, *args)
+        finally:
+            registry.record(name, time.perf_counter() - start, _input_chars(essay_text))
+    return wrapper
+
+def _profiled(name, func, registry):
+    import cProfile
+    import io
+    import pstats
+
+    timed = _timed(name, func, registry)
+
+    @wraps(func)
+    def wrapper(essay_text, *args):
+        if not _profile_lock.acquire(blocking=False):
+            return timed(essay_text, *args)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func, essay_text, *args)
+        finally:
+            seconds = time.perf_counter() - start
+            _profile_lock.release()
+            chars = _input_chars(essay_text)
+            registry.record(name, seconds, chars)
+            if registry.wants_profile(seconds):
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+                registry.add_profile(seconds, chars, out.getvalue())
+    return wrapper
+
+def enable(registry=None):
+    """Instruments the scoring module, recording into registry (a new one by default), and returns the registry."""
+    global _active
+    disable()
+    registry = registry if registry is not None else MetricsRegistry()
+    for name in INSTRUMENTED:
+        func = getattr(scoring, name)
+        _originals[name] = func
+        wrap = _profiled if name == "score_essay" and registry.profile_slowest > 0 else _timed
+        setattr(scoring, name, wrap(name, func, registry))
+    _active = registry
+    return registry
+
+def disable():
+    """Restores the uninstrumented scoring functions."""
+    global _active
+    for name, func in _originals.items():
+        setattr(scoring, name, func)
+    _originals.clear()
+    _active = None
+
+def active_registry():
+    """Returns the registry currently being recorded into, or None when disabled."""
+    return _active
+
+def init_worker(profile_slowest=0):
+    """Pool initializer that instruments scoring inside a worker process."""
+    enable(MetricsRegistry(profile_slowest))
+
+def call_and_drain(func, *args):
+    """Runs func(*args) in a worker and returns (result, drained metrics) for the parent to merge."""
+    result = func(*args)
+    return result, _active.drain()
@@ -0,0 +1,210 @@
+"""Memory-mapped word lexicon: frequency rank, CEFR level and Academic Word List membership.
+
+Usage: python main.py lexicon SOURCE [-o lexicon.bin]
+
+SOURCE is a tab-separated file with one word per line:
+    word <TAB> frequency rank <TAB> CEFR level (A1..C2, or empty) <TAB> 1 if on the Academic Word List
+Blank lines and lines starting with '#' are ignored.
+
+The built file is an open-addressing hash table laid out for mmap: a header,
+a slot array of record numbers, fixed-size records and a UTF-8 string blob.
+Opening it maps the file and reads the header, so even very large lexicons
+load in milliseconds, and every process that opens the same file shares one
+copy of it in the page cache.
+"""
+import os
+import struct
+import sys
+import zlib
+from collections import Counter
+
+DEFAULT_LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.bin")
+
+MAGIC = b'IELTSLX1'
+CEFR_LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+RARE_WORD_RANK = 5000  # words ranked beyond this are counted as rare
+ADVANCED_LEVEL = CEFR_LEVELS.index('B2') + 1
+
+_HEADER = struct.Struct('<8sIIII32s')  # magic, slots, words, records offset, strings offset, content digest
+_SLOT = struct.Struct('<I')            # record number + 1, or 0 for an empty slot
+_RECORD = struct.Struct('<IHBBI')      # string offset, string length, CEFR level (0 = unknown), flags, frequency rank
+_FLAG_AWL = 1
+
+def _slot(key, slots):
+    return zlib.crc32(key) & (slots - 1)
+
+def read_source(path):
+    """Yields (word, rank, level, awl) from a tab-separated source. Raises ValueError for a malformed line."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.rstrip('\r\n').split('\t')
+            try:
+                word, rank = fields[0].strip(), int(fields[1])
+                level = fields[2].strip().upper() if len(fields) > 2 else ''
+                awl = len(fields) > 3 and fields[3].strip() == '1'
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{line_number}: expected 'word<TAB>rank[<TAB>level[<TAB>awl]]'") from None
+            if not word or rank < 1 or (level and level not in CEFR_LEVELS):
+                raise ValueError(f"{path}:{line_number}: invalid word, rank or CEFR level")
+            yield word, rank, level, awl
+
+def build_lexicon(entries, path):
+    """
+    Writes (word, rank, level, awl) entries to a lexicon file at path, atomically.
+    Words are lowercased; a repeated word keeps its best rank. Returns the number of words.
+    """
+    import hashlib
+
+    words = {}
+    for word, rank, level, awl in entries:
+        key = word.lower().encode('utf-8')
+        if key not in words or rank < words[key][0]:
+            words[key] = (rank, CEFR_LEVELS.index(level) + 1 if level else 0, _FLAG_AWL if awl else 0)
+
+    slots = 1
+    while slots < 2 * len(words):
+        slots *= 2  # keeps the table at most half full
+    table = [0] * slots
+    records, strings = bytearray(), bytearray()
+    for number, (key, (rank, level, flags)) in enumerate(sorted(words.items()), 1):
+        records += _RECORD.pack(len(strings), len(key), level, flags, rank)
+        strings += key
+        i = _slot(key, slots)
+        while table[i]:
+            i = (i + 1) & (slots - 1)
+        table[i] = number
+
+    records_offset = _HEADER.size + slots * _SLOT.size
+    strings_offset = records_offset + len(records)
+    digest = hashlib.sha256(bytes(records) + bytes(strings)).digest()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, slots, len(words), records_offset, strings_offset, digest))
+        f.write(struct.pack(f'<{slots}I', *table))
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(words)
+
+class Lexicon:
+    """Read-only, memory-mapped view of a lexicon file."""
+
+    def __init__(self, path):
+        import mmap  # only loaded once a lexicon has been built
+
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # an empty file cannot be mapped
+                raise ValueError(f"{path}: not a lexicon file") from None
+        try:
+            magic, self.slots, self.words, self.records, self.strings, digest = _HEADER.unpack_from(self.map)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path}: not a lexicon file")
+        # lookup() masks with slots - 1, so slots must be a power of two, and every section must lie inside the file.
+        if (self.slots < 1 or self.slots & (self.slots - 1) or self.words > self.slots
+                or self.records != _HEADER.size + self.slots * _SLOT.size
+                or self.strings < self.records + self.words * _RECORD.size or self.strings > len(self.map)):
+            self.map.close()
+            raise ValueError(f"{path}: corrupt lexicon header")
+        self.digest = digest.hex()
+
+    def __len__(self):
+        return self.words
+
+    def lookup(self, word):
+        """
+        Returns (rank, CEFR level or None, on the AWL) for a lowercase word, or None
+        if it is not listed. The header is checked at open but the table is not,
+        so a slot or record that points outside its section also reads as None.
+        """
+        key = word.encode('utf-8', 'surrogatepass')
+        i = _slot(key, self.slots)
+        for _ in range(self.slots):
+            number = _SLOT.unpack_from(self.map, _HEADER.size + i * _SLOT.size)[0]
+            if not number or number > self.words:
+                return None
+            offset, length, level, flags, rank = _RECORD.unpack_from(self.map, self.records + (number - 1) * _RECORD.size)
+            start = self.strings + offset
+            if length == len(key) and self.map[start:start + length] == key:
+                if level > len(CEFR_LEVELS):
+                    return None
+                return rank, CEFR_LEVELS[level - 1] if level else None, bool(flags & _FLAG_AWL)
+            i = (i + 1) & (self.slots - 1)
+        return None
+
+    def profile(self, words):
+        """
+        Summarizes the vocabulary of a list of lowercase words: rare-word ratio and
+        share of B2+ words among listed words, AWL coverage and type-token ratio
+        of all words, and the number of words at each CEFR level.
+        """
+        counts = Counter(words)
+        known = rare = academic = advanced = 0
+        levels = dict.fromkeys(CEFR_LEVELS, 0)
+        for word, n in counts.items():
+            entry = self.lookup(word)
+            if entry is None:
+                continue
+            rank, level, awl = entry
+            known += n
+            rare += n * (rank > RARE_WORD_RANK)
+            academic += n * awl
+            if level is not None:
+                levels[level] += n
+                advanced += n * (CEFR_LEVELS.index(level) + 1 >= ADVANCED_LEVEL)
+        total = len(words)
+        return {
+            "words": total,
+            "listed_words": known,
+            "rare_word_ratio": rare / known if known else 0.0,
+            "advanced_word_ratio": advanced / known if known else 0.0,
+            "awl_coverage": academic / total if total else 0.0,
+            "type_token_ratio": len(counts) / total if total else 0.0,
+            "cefr_levels": levels,
+        }
+
+    def close(self):
+        self.map.close()
+
+def open_lexicon(path=DEFAULT_LEXICON_FILE):
+    """
+    Returns the Lexicon at path, or None if no lexicon has been built there.
+    An unreadable or corrupt file is also treated as missing, with a warning,
+    so it cannot stop the app and the tools from starting.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return Lexicon(path)
+    except (OSError, ValueError) as e:
+        print(f"lexicon: {e}; continuing without a lexicon", file=sys.stderr)
+        return None
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog="main.py lexicon", description="Build the memory-mapped word lexicon.")
+    parser.add_argument("source", help="tab-separated word list: word, frequency rank, CEFR level, AWL flag")
+    parser.add_argument("-o", "--output", default=DEFAULT_LEXICON_FILE, help="lexicon file to write (default: lexicon.bin next to the app)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        words = build_lexicon(read_source(args.source), args.output)
+    except (OSError, ValueError) as e:
+        print(f"lexicon: {e}", file=sys.stderr)
+        return 1
+    size = os.path.getsize(args.output)
+    print(f"lexicon: wrote {words} words ({size / 1024:.0f} KiB) to {args.output} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Cohesive-device lexicon and a one-pass phrase matcher.
+
+The lexicon file is a JSON object mapping categories to linking phrases, e.g.
+    {"categories": {"contrast": ["however", "on the other hand"], ...},
+     "scored": ["however", ...]}
+"scored" lists the connectors the coherence band counts; phrases that extend
+one of them, such as "as a result of", count as well. Without it, every
+phrase counts. The other phrases are only reported.
+
+PhraseIndex compiles the phrases into a word trie. A scan looks up each word
+once and only walks the trie where a phrase can start. Phrases match whole
+words, case-insensitively. Their words may be separated by any whitespace
+except a paragraph break. At each position the longest phrase wins and
+matches never overlap, so "in addition" is not found inside "in additional"
+and "as a result" is not counted again inside "as a result of".
+"""
+import os
+import re
+from itertools import compress, count
+
+from grammar import fold
+
+DEFAULT_PHRASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cohesive_devices.json")
+
+_END = ''  # trie key marking the end of a phrase; words are never empty
+_PHRASE_RE = re.compile(r'\w+(?: \w+)*')
+
+class PhraseIndex:
+    """A compiled phrase lexicon with a category for every phrase."""
+
+    def __init__(self, categories, path=None, scored=None):
+        self.path = path
+        self.categories = {}  # phrase -> category, in lexicon order
+        self.trie = {}
+        for category, phrases in categories.items():
+            if not isinstance(phrases, list):
+                raise ValueError(f"category {category}: expected a list of phrases")
+            for phrase in phrases:
+                if not isinstance(phrase, str) or not _PHRASE_RE.fullmatch(phrase.strip()):
+                    raise ValueError(f"category {category}: {phrase!r} is not a phrase of words separated by spaces")
+                phrase = ' '.join(fold(word) for word in phrase.split())
+                if phrase in self.categories:
+                    raise ValueError(f"category {category}: {phrase!r} is already in {self.categories[phrase]}")
+                self.categories[phrase] = category
+                node = self.trie
+                for word in phrase.split():
+                    node = node.setdefault(word, {})
+                node[_END] = phrase
+
+        if scored is None:
+            self.scored = frozenset(self.categories)
+        else:
+            keys = []
+            for phrase in scored:
+                key = ' '.join(fold(word) for word in phrase.split()) if isinstance(phrase, str) else None
+                if key not in self.categories:
+                    raise ValueError(f"scored: {phrase!r} is not a phrase of the lexicon")
+                keys.append(key)
+            self.scored = frozenset(phrase for phrase in self.categories
+                                    if any(phrase == key or phrase.startswith(key + ' ') for key in keys))
+
+    @property
+    def phrases(self):
+        return list(self.categories)
+
+    def counts(self, pairs, words):
+        """
+        Returns {phrase: occurrences} for the phrases found in a text, given its
+        (word, separator) tuples and their folded words.
+        """
+        counts = {}
+        trie = self.trie
+        last = len(words) - 1
+        resume = 0
+        for i in compress(count(), map(trie.__contains__, words)):
+            if i < resume:
+                continue
+            node, j, found = trie[words[i]], i, None
+            while True:
+                if _END in node:
+                    found, resume = node[_END], j + 1
+                if j == last:
+                    break
+                sep = pairs[j][1]
+                if not sep.isspace() or sep.count('\n') > 1:
+                    break
+                j += 1
+                node = node.get(words[j])
+                if node is None:
+                    break
+            if found is not None:
+                counts[found] = counts.get(found, 0) + 1
+        return counts
+
+    def scored_count(self, counts):
+        """Totals the phrase counts of the scored connectors."""
+        return sum(n for phrase, n in counts.items() if phrase in self.scored)
+
+    def by_category(self, counts):
+        """Totals phrase counts per category, in lexicon order, leaving out empty categories."""
+        totals = {}
+        for phrase, n in counts.items():
+            category = self.categories[phrase]
+            totals[category] = totals.get(category, 0) + n
+        return {category: totals[category] for category in dict.fromkeys(self.categories.values()) if category in totals}
+
+def load_phrases(path=DEFAULT_PHRASE_FILE):
+    """Loads and compiles a phrase lexicon. Raises ValueError describing the first invalid entry."""
+    import json  # only needed once, when the lexicon is first used
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), dict):
+        raise ValueError(f"{path}: expected an object with a 'categories' mapping")
+    if not isinstance(data.get("scored", []), list):
+        raise ValueError(f"{path}: 'scored' must be a list of phrases")
+    try:
+        return PhraseIndex(data["categories"], path, data.get("scored"))
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
@@ -0,0 +1,240 @@
+"""Prompt bank: IELTS Writing Task 1 charts and Task 2 questions, indexed on disk.
+
+Usage: python main.py prompts [--task 1|2] [--chart-type TYPE] [--topic TOPIC] [--reindex]
+
+Prompts are stored as JSONL shards under prompt_bank/, one prompt per line:
+    {"id": "t2-tourism", "task": 2, "topic": "tourism", "text": "..."}
+    {"id": "t1-bricks", "task": 1, "topic": "manufacturing", "type": "diagram", "text": "...", "data": {...}}
+Task 1 types are bar_chart, line_graph and diagram, with chart data as
+charts.py lays it out. Any number of *.jsonl shards may be added.
+
+An SQLite index next to the shards maps each prompt id to its task, chart
+type, topic and byte range. Opening the bank rescans only the shards whose
+size or modification time changed, and a prompt is read from its shard when
+it is used, so the bank can hold tens of thousands of prompts without
+loading them. PromptSampler draws from the bank without repeats.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+from functools import lru_cache
+
+BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_bank")
+INDEX_FILE = "index.db"
+CHART_TYPES = ("bar_chart", "line_graph", "diagram")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prompts (
+    id TEXT PRIMARY KEY,
+    task INTEGER NOT NULL,
+    chart_type TEXT,
+    topic TEXT NOT NULL,
+    shard TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prompts_filter ON prompts (task, chart_type, topic);
+CREATE INDEX IF NOT EXISTS prompts_topic ON prompts (task, topic);
+CREATE INDEX IF NOT EXISTS prompts_shard ON prompts (shard);
+"""
+
+def validate_prompt(prompt, where):
+    """Raises ValueError, prefixed with where, unless prompt is a valid bank entry."""
+    if not isinstance(prompt, dict):
+        raise ValueError(f"{where}: expected a JSON object")
+    for field in ("id", "topic", "text"):
+        if not isinstance(prompt.get(field), str) or not prompt[field].strip():
+            raise ValueError(f"{where}: '{field}' must be a non-empty string")
+    if prompt.get("task") not in (1, 2):
+        raise ValueError(f"{where}: 'task' must be 1 or 2")
+    if prompt["task"] == 1:
+        if prompt.get("type") not in CHART_TYPES:
+            raise ValueError(f"{where}: 'type' must be one of {', '.join(CHART_TYPES)}")
+        if not isinstance(prompt.get("data"), dict):
+            raise ValueError(f"{where}: 'data' must be an object")
+
+def _scan_shard(path, name):
+    """Yields index rows (id, task, chart type, topic, shard, start, length) for the prompts of a shard."""
+    with open(path, 'rb') as f:
+        start = 0
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    prompt = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from None
+                validate_prompt(prompt, f"{path}:{line_number}")
+                yield prompt["id"], prompt["task"], prompt.get("type") if prompt["task"] == 1 else None, prompt["topic"], name, start, len(line)
+            start += len(line)
+
+class PromptBank:
+    """Indexed, lazily read prompt shards. Safe to share between threads."""
+
+    def __init__(self, directory=BANK_DIR, index_path=None):
+        self.directory = directory
+        index_path = index_path or os.path.join(directory, INDEX_FILE)
+        try:
+            self.conn = sqlite3.connect(index_path, check_same_thread=False)
+            self.conn.executescript(_SCHEMA)
+        except sqlite3.OperationalError:  # read-only install: keep the index in memory
+            self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+        self.files = {}  # shard name -> open binary file
+        self.errors = []  # why each shard skipped by the last refresh could not be indexed
+        self.refresh()
+
+    def refresh(self, force=False):
+        """
+        Re-indexes shards that were added, changed or removed since the index was
+        built. A shard that cannot be read or holds an invalid prompt is left out
+        of the index, and the problem is added to errors; it is retried on the
+        next refresh.
+        """
+        self.errors = []
+        shards = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".jsonl"):
+                stat = os.stat(os.path.join(self.directory, name))
+                shards[name] = (stat.st_size, stat.st_mtime_ns)
+        with self.lock, self.conn:
+            known = {name: (size, mtime) for name, size, mtime in self.conn.execute("SELECT * FROM shards")}
+            for name in sorted(known.keys() | shards.keys()):
+                if not force and known.get(name) == shards.get(name):
+                    continue
+                self.conn.execute("DELETE FROM prompts WHERE shard = ?", (name,))
+                self.conn.execute("DELETE FROM shards WHERE name = ?", (name,))
+                handle = self.files.pop(name, None)
+                if handle is not None:
+                    handle.close()
+                if name not in shards:
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    self.conn.executemany("INSERT INTO prompts VALUES (?, ?, ?, ?, ?, ?, ?)", _scan_shard(path, name))
+                except sqlite3.IntegrityError:
+                    error = f"{path}: a prompt id is already used by another prompt"
+                except (OSError, ValueError) as e:
+                    error = str(e)
+                else:
+                    self.conn.execute("INSERT INTO shards VALUES (?, ?, ?)", (name, *shards[name]))
+                    continue
+                self.conn.execute("DELETE FROM prompts WHERE shard = ?", (name,))  # the rows read before the error
+                self.errors.append(error)
+
+    @staticmethod
+    def _where(task, chart_type, topic):
+        clauses, params = [], []
+        for column, value in (("task", task), ("chart_type", chart_type), ("topic", topic)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def ids(self, task=None, chart_type=None, topic=None):
+        """Returns the ids of the prompts matching every given filter, sorted."""
+        where, params = self._where(task, chart_type, topic)
+        with self.lock:
+            return [row[0] for row in self.conn.execute(f"SELECT id FROM prompts{where} ORDER BY id", params)]
+
+    def count(self, task=None, chart_type=None, topic=None):
+        where, params = self._where(task, chart_type, topic)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM prompts{where}", params).fetchone()[0]
+
+    def topics(self, task=None):
+        """Returns {topic: number of prompts}, sorted by topic."""
+        where, params = self._where(task, None, None)
+        with self.lock:
+            return dict(self.conn.execute(f"SELECT topic, COUNT(*) FROM prompts{where} GROUP BY topic ORDER BY topic", params))
+
+    def get(self, prompt_id):
+        """Reads a prompt from its shard. Raises KeyError for an unknown id."""
+        with self.lock:
+            row = self.conn.execute("SELECT shard, start, length FROM prompts WHERE id = ?", (prompt_id,)).fetchone()
+            if row is None:
+                raise KeyError(prompt_id)
+            shard, start, length = row
+            f = self.files.get(shard)
+            if f is None:
+                f = self.files[shard] = open(os.path.join(self.directory, shard), 'rb')
+            f.seek(start)
+            line = f.read(length)
+        return json.loads(line)
+
+    def close(self):
+        with self.lock:
+            for f in self.files.values():
+                f.close()
+            self.files.clear()
+            self.conn.close()
+
+class PromptSampler:
+    """
+    Draws the prompts of a task, optionally of one chart type or topic, in
+    random order. No prompt repeats until all matching prompts have been
+    drawn; the next round is reshuffled, never starting with the last one.
+    """
+
+    def __init__(self, bank, task, chart_type=None, topic=None, rng=None):
+        self.bank = bank
+        self.filters = (task, chart_type, topic)
+        self.rng = rng or random.Random()
+        self.queue = []
+        self.last = None
+
+    def draw(self):
+        """Returns the next prompt, or None if no prompt matches."""
+        if not self.queue:
+            self.queue = self.bank.ids(*self.filters)
+            self.rng.shuffle(self.queue)
+            if len(self.queue) > 1 and self.queue[-1] == self.last:
+                self.queue[0], self.queue[-1] = self.queue[-1], self.queue[0]
+            if not self.queue:
+                return None
+        self.last = self.queue.pop()
+        return self.bank.get(self.last)
+
+@lru_cache(maxsize=None)
+def default_bank():
+    """Returns the PromptBank of prompt_bank/, opened on first use."""
+    return PromptBank()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py prompts", description="Index the prompt bank and list its prompts.")
+    parser.add_argument("--task", type=int, choices=(1, 2), help="only list prompts of this task")
+    parser.add_argument("--chart-type", choices=CHART_TYPES, help="only list Task 1 prompts of this chart type")
+    parser.add_argument("--topic", help="only list prompts on this topic")
+    parser.add_argument("--reindex", action="store_true", help="rebuild the index of every shard")
+    args = parser.parse_args(argv)
+
+    try:
+        bank = PromptBank()
+        if args.reindex:
+            bank.refresh(force=True)
+    except OSError as e:
+        print(f"prompts: {e}", file=sys.stderr)
+        return 1
+    for error in bank.errors:
+        print(f"prompts: skipped {error}", file=sys.stderr)
+    for prompt_id in bank.ids(args.task, args.chart_type, args.topic):
+        prompt = bank.get(prompt_id)
+        kind = prompt.get("type") if prompt["task"] == 1 else "essay"
+        print(f"{prompt_id}\ttask {prompt['task']}\t{kind}\t{prompt['topic']}")
+    topics = bank.topics(args.task)
+    print(f"prompts: {bank.count(args.task, args.chart_type, args.topic)} matching of {bank.count()}; "
+          f"topics: {', '.join(f'{topic} {n}' for topic, n in topics.items())}", file=sys.stderr)
+    bank.close()
+    return 1 if bank.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Essay scoring core: the IELTS criteria, shared analysis and band arithmetic.
+
+Kept free of GUI imports so batch workers and other headless callers can load it cheaply.
+The grammar rules, phrase lexicon and word lexicon are loaded on first use, not at import.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+
+import grammar
+import lexicon
+import phrases
+
+# --- Shared essay analysis ---
+# score_essay tokenizes and scans the essay once into an EssayAnalysis record;
+# every assess_* function reads its counts from that record instead of
+# re-running its own regexes over the full text.
+
+@lru_cache(maxsize=None)
+def cohesive_devices():
+    """Returns the PhraseIndex of linking phrases by category, loaded on first use."""
+    return phrases.load_phrases(phrases.DEFAULT_PHRASE_FILE)
+
+@lru_cache(maxsize=None)
+def grammar_rules():
+    """Returns the grammar RuleSet (a/an, agreement, spelling and other checks), loaded on first use."""
+    return grammar.load_rules(grammar.DEFAULT_RULE_FILE)
+
+@lru_cache(maxsize=None)
+def word_lexicon():
+    """Returns the memory-mapped Lexicon, or None until `main.py lexicon` has built one."""
+    return lexicon.open_lexicon(lexicon.DEFAULT_LEXICON_FILE)
+
+_TOKEN_RE = re.compile(r'(\w+)(\W*)')  # each word plus the separator that follows it
+_WORD_RE = re.compile(r'\b\w+\b')
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_PARAGRAPH_SPLIT_RE = re.compile(r'(\n\s*\n)')  # keeps the separators
+
+EssayAnalysis = namedtuple('EssayAnalysis', [
+    'text',              # the essay as submitted
+    'words',             # lowercased word tokens
+    'word_lengths',      # len() of each entry in words
+    'word_count',        # number of word tokens in the original text
+    'paragraphs',        # blank-line separated blocks of the stripped text
+    'grammar_matches',   # GrammarMatch for each grammar_rules() match, with its character offsets
+    'connector_counts',  # occurrences of each cohesive_devices() phrase found in the text
+])
+
+def analyze_essay(essay_text):
+    """
+    Tokenizes and scans the essay once, returning the EssayAnalysis shared by all criteria.
+    An existing EssayAnalysis is returned unchanged.
+    """
+    if isinstance(essay_text, EssayAnalysis):
+        return essay_text
+    pairs = _TOKEN_RE.findall(essay_text)
+    if essay_text.isascii():
+        words = folded = ' '.join(map(itemgetter(0), pairs)).lower().split()
+    else:
+        # Lowercasing some non-ASCII letters changes how the text splits into words.
+        words = _WORD_RE.findall(essay_text.lower())
+        folded = [grammar.fold(token) for token, _ in pairs]
+    return EssayAnalysis(
+        text=essay_text,
+        words=words,
+        word_lengths=list(map(len, words)),
+        word_count=len(pairs),
+        paragraphs=_PARAGRAPH_RE.split(essay_text.strip()),
+        grammar_matches=grammar_rules().scan(essay_text, pairs, folded),
+        connector_counts=cohesive_devices().counts(pairs, folded),
+    )
+
+class _ParagraphState:
+    """The parts of analyze_essay that depend only on one paragraph's text."""
+
+    __slots__ = ('pairs', 'lead', 'words', 'word_lengths', 'folded', 'connector_counts')
+
+    def __init__(self, text):
+        self.pairs = _TOKEN_RE.findall(text)
+        first_word = _WORD_RE.search(text)
+        self.lead = text[:first_word.start()] if first_word else text
+        if text.isascii():
+            self.words = self.folded = ' '.join(map(itemgetter(0), self.pairs)).lower().split()
+        else:
+            self.words = _WORD_RE.findall(text.lower())
+            self.folded = [grammar.fold(token) for token, _ in self.pairs]
+        self.word_lengths = list(map(len, self.words))
+        self.connector_counts = cohesive_devices().counts(self.pairs, self.folded)
+
+class IncrementalAnalyzer:
+    """
+    Produces the same EssayAnalysis as analyze_essay for successive versions of
+    an essay, re-tokenizing only paragraphs whose text changed since the last
+    call. Cohesive devices never span a blank line, so their counts add up per
+    paragraph. Grammar rules can match across a paragraph break, so they are
+    run over the joined tokens of the whole essay by a grammar.IncrementalScan,
+    which only rescans from the first changed word.
+    """
+
+    def __init__(self):
+        self.states = {}  # paragraph text -> _ParagraphState
+        self.scan = None  # grammar.IncrementalScan, created on first use
+
+    def analyze(self, essay_text):
+        parts = _PARAGRAPH_SPLIT_RE.split(essay_text.strip())
+        paragraphs, separators = parts[0::2], parts[1::2]
+        states = [self.states.get(p) or _ParagraphState(p) for p in paragraphs]
+        self.states = dict(zip(paragraphs, states))
+
+        # Rebuild the (word, separator) pairs of the whole essay: the text between
+        # the last word of one paragraph and the first word of the next belongs to
+        # the separator of that last word.
+        pairs, folded = [], []
+        gap = None  # text after the last word so far
+        for index, state in enumerate(states):
+            if state.pairs:
+                if pairs:
+                    pairs[-1] = (pairs[-1][0], pairs[-1][1] + gap + state.lead)
+                pairs += state.pairs
+                folded += state.folded
+                gap = ''
+            elif gap is not None:
+                gap += paragraphs[index]
+            if gap is not None and index < len(separators):
+                gap += separators[index]
+        if gap:
+            pairs[-1] = (pairs[-1][0], pairs[-1][1] + gap)
+
+        if self.scan is None:
+            self.scan = grammar.IncrementalScan(grammar_rules())
+        connector_counts = {}
+        for state in states:
+            for phrase, n in state.connector_counts.items():
+                connector_counts[phrase] = connector_counts.get(phrase, 0) + n
+        return EssayAnalysis(
+            text=essay_text,
+            words=list(chain.from_iterable(state.words for state in states)),
+            word_lengths=list(chain.from_iterable(state.word_lengths for state in states)),
+            word_count=len(pairs),
+            paragraphs=paragraphs,
+            grammar_matches=self.scan.scan(essay_text, pairs, folded),
+            connector_counts=connector_counts,
+        )
+
+def assess_grammatical_range_and_accuracy(essay_text):
+    """
+    Assesses the grammatical range and accuracy of the essay with the rules in grammar_rules().
+    """
+    errors = grammar_rules().issues(analyze_essay(essay_text).grammar_matches)
+
+    num_errors = len(errors)
+    
+    if num_errors == 0: score = 9.0
+    elif num_errors == 1: score = 7.5
+    elif num_errors <= 3: score = 6.0
+    else: score = 5.0
+
+    reason = f"Found {num_errors} potential grammatical issues."
+    if num_errors == 0: reason = "No obvious grammatical errors found."
+    if errors: reason += " Details: " + " ".join(errors)
+    return score, reason
+
+def assess_lexical_resource(essay_text):
+    """
+    Assesses the lexical resource of the essay using average word length.
+    With a word_lexicon(), the reason also describes the essay's vocabulary profile.
+    """
+    analysis = analyze_essay(essay_text)
+    if not analysis.words: return 4.0, "The essay appears to be empty."
+    avg_word_length = sum(analysis.word_lengths) / len(analysis.words)
+    
+    if avg_word_length > 5.2: score = 9.0
+    elif avg_word_length > 4.8: score = 8.0
+    elif avg_word_length > 4.5: score = 7.0
+    elif avg_word_length > 4.2: score = 6.0
+    elif avg_word_length > 3.8: score = 5.0
+    else: score = 4.0
+        
+    reason = f"The average word length is {avg_word_length:.2f}, which indicates vocabulary complexity."
+    lex = word_lexicon()
+    if lex is not None:
+        profile = lex.profile(analysis.words)
+        reason += (f" Vocabulary profile: {profile['rare_word_ratio']:.0%} rare words, {profile['advanced_word_ratio']:.0%} at B2 or above,"
+                   f" {profile['awl_coverage']:.0%} academic words, type-token ratio {profile['type_token_ratio']:.2f}.")
+    return score, reason
+
+def assess_task_1_response(essay_text):
+    """Assesses the task response for Task 1 (word count)."""
+    word_count = analyze_essay(essay_text).word_count
+    if word_count < 120: return 4.0, f"Essay is too short ({word_count} words). Min 150 required."
+    if word_count < 150: return 5.0, f"Essay is slightly short ({word_count} words). Aim for 150."
+    if word_count <= 250: return 8.0, f"The essay has a suitable length of {word_count} words."
+    return 7.0, f"The essay has a good length ({word_count} words), but ensure it remains concise."
+
+def assess_task_2_response(essay_text):
+    """Assesses the task response for Task 2 (word count)."""
+    word_count = analyze_essay(essay_text).word_count
+    if word_count < 200: return 4.0, f"Essay is too short ({word_count} words). Min 250 required."
+    if word_count < 250: return 5.0, f"Essay is slightly short ({word_count} words). Aim for 250."
+    if word_count <= 350: return 8.0, f"The essay has a suitable length of {word_count} words."
+    return 7.0, f"The essay has a good length ({word_count} words), but ensure it remains concise."
+
+def assess_coherence_and_cohesion(essay_text):
+    """Assesses the coherence and cohesion of the essay."""
+    analysis = analyze_essay(essay_text)
+    devices = cohesive_devices()
+    connector_count = devices.scored_count(analysis.connector_counts)
+    num_paragraphs = len(analysis.paragraphs)
+    
+    points = 0
+    if connector_count >= 5: points += 2
+    elif connector_count >= 3: points += 1
+    if 3 <= num_paragraphs <= 5: points += 2
+    elif num_paragraphs > 1: points += 1
+
+    scores = {4: 8.5, 3: 7.5, 2: 6.5, 1: 5.5}
+    score = scores.get(points, 4.5)
+    reason = f"Found {connector_count} connectors and {num_paragraphs} paragraphs."
+    categories = devices.by_category(analysis.connector_counts)
+    if categories:
+        reason += " Linking phrases by type: " + ", ".join(f"{category.replace('_', ' ')} {n}" for category, n in categories.items()) + "."
+    return score, reason
+
+def round_to_half(score):
+    return round(score * 2) / 2
+
+def score_essay(essay_text, task_type):
+    """Scores an English essay based on IELTS criteria."""
+    analysis = analyze_essay(essay_text)
+    tr_func = assess_task_1_response if task_type == 1 else assess_task_2_response
+    scores = [
+        assess_grammatical_range_and_accuracy(analysis),
+        assess_lexical_resource(analysis),
+        tr_func(analysis),
+        assess_coherence_and_cohesion(analysis)
+    ]
+    
+    final_score = round_to_half(sum(s[0] for s in scores) / 4)
+    criteria = ("grammatical_range_and_accuracy", "lexical_resource", "task_response", "coherence_and_cohesion")
+    reasons = {criterion: reason for criterion, (_, reason) in zip(criteria, scores)}
+    bands = {criterion: band for criterion, (band, _) in zip(criteria, scores)}
+    return {"score": final_score, "reasons": reasons, "bands": bands}
+
+MIN_ESSAY_CHARS = 10
+
+def score_submission(essay_text, task_type):
+    """Scores an essay, or returns a zero-score placeholder if nothing meaningful was entered."""
+    text = essay_text.text if isinstance(essay_text, EssayAnalysis) else essay_text
+    if len(text.strip()) < MIN_ESSAY_CHARS:
+        return {"score": 0.0, "reasons": {"Info": "Please enter an essay."}}
+    return score_essay(essay_text, task_type)
+
+def overall_score(task1_score, task2_score):
+    """Returns the 40/60 weighted overall band, or None until both tasks have a score."""
+    if task1_score > 0 and task2_score > 0:
+        return round_to_half((task1_score * 0.4) + (task2_score * 0.6))
+    return None
@@ -0,0 +1,257 @@
+"""Local HTTP/JSON scoring service.
+
+Usage: python main.py serve [--host 127.0.0.1] [--port 8765] [--workers N] [--executor process|thread]
+                            [--instrument] [--profile-slowest N]
+
+Endpoints:
+    POST /score    {"task": 1, "text": "..."}             -> {"score": ..., "reasons": {...}}
+                   {"essays": [{"id", "candidate", "task", "text"}, ...]}
+                                                          -> {"results": [...], "overall": [...]}
+    GET  /health   liveness and pool configuration
+    GET  /metrics  request, essay and latency counters, plus per-stage scoring
+                   timings with --instrument (?format=prometheus for text)
+    GET  /profiles cProfile output of the slowest essays, with --profile-slowest
+    GET  /charts/ID.ps, /charts/ID.png
+                   the chart of the Task 1 prompt with that id; PNG needs Pillow
+
+Scoring runs on a shared thread or process pool; the HTTP threads only parse
+JSON and wait for results. Everything runs offline with the standard library.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import charts
+import instrumentation
+from batch import essay_record, essay_row, score_record, with_overall
+from cache import ScoreCache
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_ESSAYS = 1000
+LATENCY_WINDOW = 1024  # recent requests kept for the latency percentiles
+
+EXECUTORS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+class ServiceStats:
+    """Thread-safe throughput and latency counters exposed on /metrics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.essays = 0
+        self.latency_total = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds, essays=0, error=False):
+        with self.lock:
+            self.requests += 1
+            self.errors += error
+            self.essays += essays
+            self.latency_total += seconds
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            recent = sorted(self.latencies)
+            snapshot = {
+                "uptime_seconds": round(uptime, 3),
+                "requests_total": self.requests,
+                "errors_total": self.errors,
+                "essays_total": self.essays,
+                "essays_per_second": round(self.essays / uptime, 3) if uptime > 0 else 0.0,
+                "latency_mean_ms": round(self.latency_total / self.requests * 1000, 3) if self.requests else None,
+            }
+        for name, q in (("latency_p50_ms", 0.50), ("latency_p99_ms", 0.99)):
+            snapshot[name] = round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 3) if recent else None
+        return snapshot
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, executor="process", cache=None, metrics=None):
+        """
+        With a MetricsRegistry as metrics, scoring is instrumented: directly in
+        this process for the thread pool, or in each worker for the process
+        pool, whose timings are merged back with every result.
+        """
+        super().__init__(address, ScoringRequestHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.metrics = metrics
+        self.score_func = score_record
+        self.drains_metrics = metrics is not None and executor == "process"
+        if self.drains_metrics:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=instrumentation.init_worker,
+                                                initargs=(metrics.profile_slowest,))
+            self.score_func = partial(instrumentation.call_and_drain, score_record)
+        else:
+            self.executor = EXECUTORS[executor](max_workers=self.workers)
+            if metrics is not None:
+                instrumentation.enable(metrics)
+        self.stats = ServiceStats()
+        self.cache = cache if cache is not None else ScoreCache(maxsize=0)
+
+    def score(self, records):
+        """Scores (id, candidate, task, text) tuples on the pool, keeping the input order."""
+        keys = [self.cache.key(record[3], record[2]) for record in records]
+        rows = [None] * len(records)
+        misses = []
+        for index, (key, record) in enumerate(zip(keys, records)):
+            result = self.cache.get(key)
+            if result is None:
+                misses.append(index)
+            else:
+                rows[index] = essay_row(record, result)
+        chunksize = max(1, len(misses) // (self.workers * 4)) if self.executor_kind == "process" else 1
+        for index, row in zip(misses, self.executor.map(self.score_func, [records[i] for i in misses], chunksize=chunksize)):
+            if self.drains_metrics:
+                row, data = row
+                self.metrics.merge(data)
+            self.cache.put(keys[index], {"score": row["score"], "reasons": row["reasons"]})
+            rows[index] = row
+        return rows
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if self.metrics is not None and not self.drains_metrics:
+            instrumentation.disable()
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    server_version = "IELTSScorer/1.0"
+
+    def log_message(self, format, *args):
+        pass  # per-request logging is replaced by the /metrics counters
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        metrics = self.server.metrics
+        if url.path == "/health":
+            self.send_json(200, {"status": "ok", "executor": self.server.executor_kind, "workers": self.server.workers})
+        elif url.path == "/metrics":
+            if parse_qs(url.query).get("format") == ["prometheus"]:
+                text = metrics.to_prometheus() if metrics is not None else ""
+                self.send_body(200, text.encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8")
+                return
+            snapshot = dict(self.server.stats.snapshot(), cache=self.server.cache.stats())
+            if metrics is not None:
+                snapshot["stages"] = metrics.snapshot()
+            self.send_json(200, snapshot)
+        elif url.path == "/profiles":
+            self.send_json(200, {"profiles": metrics.slowest_profiles() if metrics is not None else []})
+        elif url.path.startswith("/charts/"):
+            self.send_chart(url.path[len("/charts/"):])
+        else:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+
+    def send_chart(self, name):
+        prompt_id, _, fmt = name.rpartition(".")
+        if fmt == "png" and not charts.png_available():
+            self.send_json(501, {"error": "PNG export needs Pillow"})
+            return
+        try:
+            if fmt not in charts.EXPORT_FORMATS:
+                raise KeyError(name)
+            body = charts.export_chart(prompt_id, fmt)
+        except KeyError:
+            self.send_json(404, {"error": f"unknown chart {name}"})
+            return
+        self.send_body(200, body, charts.EXPORT_FORMATS[fmt])
+
+    def do_POST(self):
+        if self.path != "/score":
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        started = time.perf_counter()
+        status, payload, essays = self.handle_score()
+        self.server.stats.record(time.perf_counter() - started, essays, error=status != 200)  # before replying, so /metrics never lags a client
+        self.send_json(status, payload)
+
+    def handle_score(self):
+        """Returns (status, payload, essays scored) for a POST /score request."""
+        if self.headers.get("Content-Length") is None:
+            return 411, {"error": "Content-Length is required"}, 0
+        try:
+            length = int(self.headers["Content-Length"])
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            return 400, {"error": "Content-Length must be a non-negative integer"}, 0
+        if length > MAX_BODY_BYTES:
+            return 413, {"error": f"request body exceeds {MAX_BODY_BYTES} bytes"}, 0
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return 400, {"error": f"invalid JSON: {e}"}, 0
+
+        batched = isinstance(body, dict) and "essays" in body
+        items = body["essays"] if batched else [body]
+        if not isinstance(items, list) or not items:
+            return 400, {"error": "'essays' must be a non-empty list"}, 0
+        if len(items) > MAX_BATCH_ESSAYS:
+            return 413, {"error": f"at most {MAX_BATCH_ESSAYS} essays per request"}, 0
+        try:
+            records = [essay_record(item, index) for index, item in enumerate(items)]
+        except ValueError as e:
+            return 400, {"error": str(e)}, 0
+
+        try:
+            rows = self.server.score(records)
+        except Exception as e:  # e.g. BrokenProcessPool after a worker died; the client still gets an answer
+            return 500, {"error": f"scoring failed: {type(e).__name__}: {e}"}, 0
+        if not batched:
+            return 200, {"score": rows[0]["score"], "reasons": rows[0]["reasons"]}, 1
+        overall = [row for row in with_overall(rows) if row["kind"] == "overall"]
+        return 200, {"results": rows, "overall": overall}, len(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve the IELTS essay scorer over local HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("--workers", type=int, default=None, help="scoring workers (default: one per CPU)")
+    parser.add_argument("--executor", choices=sorted(EXECUTORS), default="process", help="worker pool type (default: process)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="results kept in the score cache, 0 to disable (default: 4096)")
+    parser.add_argument("--cache-file", metavar="PATH", help="load the score cache from PATH and save it on shutdown")
+    parser.add_argument("--instrument", action="store_true", help="time each scoring stage and report it on /metrics")
+    parser.add_argument("--profile-slowest", type=int, default=0, metavar="N",
+                        help="keep cProfile output of the N slowest essays on /profiles (implies --instrument)")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    cache = ScoreCache(args.cache_size, args.cache_file)
+    metrics = instrumentation.MetricsRegistry(args.profile_slowest) if args.instrument or args.profile_slowest > 0 else None
+    server = ScoringServer((args.host, args.port), args.workers, args.executor, cache, metrics)
+    print(f"Scoring service on http://{args.host}:{server.server_port} ({server.workers} {args.executor} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache.save()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Batch input parsing and the streaming scoring API."""
+import pytest
+
+from batch import iter_text_essays, parse_task, stream_scores
+from scoring import score_essay
+
+@pytest.mark.parametrize("value, task", [
+    (1, 1), ("2", 2), (" 1 ", 1), ("task1", 1), ("Task 2", 2), ("alice_task2.txt", 2), ("cohort/task-1/bob.txt", 1),
+    ("task12", None), ("task21", None), ("3", None), (12, None), ("essay", None),
+])
+def test_parse_task_matches_the_task_number_exactly(value, task):
+    assert parse_task(value) == task
+
+ESSAYS = ["First essay.\nIt has two lines.", "Second essay.\n\nIt has two paragraphs."]
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_plain_text_essays_are_split_on_delimiter_lines(size):
+    stream = "\n===\n".join(ESSAYS) + "\n  ===  \n\n===\n"
+    assert list(iter_text_essays(chunked(stream, size), 2, "===")) == [("1", "1", 2, ESSAYS[0]), ("2", "2", 2, ESSAYS[1])]
+
+def test_stream_scores_scores_plain_text_essays():
+    rows = list(stream_scores(chunked("\n===\n".join(ESSAYS), 5), default_task=1, delimiter="==="))
+    assert [(row["id"], row["score"], row["reasons"]) for row in rows] == [
+        (str(n), score_essay(essay, 1)["score"], score_essay(essay, 1)["reasons"]) for n, essay in enumerate(ESSAYS, 1)]
+
+def test_stream_scores_needs_a_task_for_plain_text():
+    with pytest.raises(ValueError):
+        stream_scores(["An essay."], delimiter="===")
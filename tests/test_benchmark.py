@@ -0,0 +1,16 @@
+"""The bench command's arguments and a minimal run."""
+import pytest
+
+import benchmark
+
+@pytest.mark.parametrize("option", ["--essays", "--repeat"])
+@pytest.mark.parametrize("value", ["0", "-3", "two"])
+def test_essays_and_repeat_must_be_positive_integers(option, value, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark.main([option, value])
+    assert exit_info.value.code == 2
+    assert option in capsys.readouterr().err
+
+def test_smallest_run_reports_every_measurement(capsys):
+    assert benchmark.main(["--sizes", "30", "--essays", "1", "--repeat", "1"]) == 0
+    assert "score_essay" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+"""The score cache: rule fingerprints, isolation of cached results and persistence."""
+import json
+import os
+import threading
+
+import pytest
+
+import cache
+import lexicon
+from cache import ScoreCache
+
+ESSAY = "Technology changes how people live. However, it has costs."
+
+@pytest.fixture
+def rules_file(tmp_path, monkeypatch):
+    """Makes the fingerprint depend on one temporary rule file only."""
+    path = tmp_path / "rules.json"
+    path.write_text("version 1")
+    monkeypatch.setattr(cache, "RULE_SOURCES", [str(path)])
+    monkeypatch.setattr(cache, "_fingerprint", None)
+    return path
+
+def change_rules(rules_file, monkeypatch, text):
+    rules_file.write_text(text)
+    monkeypatch.setattr(cache, "_fingerprint", None)  # a new process would hash the files again
+
+def test_every_scoring_module_is_fingerprinted():
+    assert lexicon.__file__ in cache.RULE_SOURCES
+
+def test_changed_rules_change_the_keys(rules_file, monkeypatch):
+    key = ScoreCache().key(ESSAY, 2)
+    assert ScoreCache().key("  " + ESSAY + "\n", 2) == key
+    change_rules(rules_file, monkeypatch, "version 2")
+    assert ScoreCache().key(ESSAY, 2) != key
+
+def test_saved_entries_are_dropped_when_the_rules_change(rules_file, monkeypatch, tmp_path):
+    path = str(tmp_path / "score_cache.json")
+    saved = ScoreCache(path=path)
+    saved.score(ESSAY, 2)
+    saved.save()
+    assert len(ScoreCache(path=path).entries) == 1
+    change_rules(rules_file, monkeypatch, "version 2")
+    assert len(ScoreCache(path=path).entries) == 0
+
+def test_callers_cannot_change_cached_results():
+    scores = ScoreCache()
+    first = scores.score(ESSAY, 2)
+    first["score"] = 0.0
+    first["reasons"].clear()
+    second = scores.score(ESSAY, 2)
+    assert second["score"] > 0 and second["reasons"]
+    second["reasons"]["task_response"] = "changed"
+    assert scores.score(ESSAY, 2)["reasons"]["task_response"] != "changed"
+
+def test_concurrent_saves_leave_a_complete_file(tmp_path):
+    path = str(tmp_path / "score_cache.json")
+    caches = [ScoreCache(path=path) for _ in range(4)]
+    for n, scores in enumerate(caches):
+        scores.score(ESSAY * (n + 1), 2)
+    errors = []
+
+    def save_repeatedly(scores):
+        try:
+            for _ in range(25):
+                scores.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_repeatedly, args=(scores,)) for scores in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    with open(path, encoding='utf-8') as f:
+        assert len(json.load(f)["entries"]) == 1
+    assert os.listdir(tmp_path) == ["score_cache.json"]
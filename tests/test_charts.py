@@ -0,0 +1,34 @@
+"""Chart layout and export."""
+from charts import build_chart, diagram, to_postscript
+
+STEPS = {
+    "title": "Recycling",
+    "steps": [
+        {"label": "Collect", "arrow_to": 2},  # points ahead to a box laid out later
+        {"label": "Sort", "arrow_to": None},
+        {"label": "Clean", "arrow_to": 4},    # wraps to the next row
+        {"label": "Melt", "arrow_to": None},
+        {"label": "Mould", "arrow_to": 0},    # points back to the first box
+    ],
+}
+
+def boxes(items):
+    return [item.coords for item in items if item.kind == "rectangle"]
+
+def arrows(items):
+    return [item.coords for item in items if item.kind == "line"]
+
+def test_diagram_arrows_may_point_to_later_and_earlier_boxes():
+    items = diagram(STEPS)
+    collect, _, clean, _, mould = boxes(items)
+    forward, wrap, back = arrows(items)
+    assert (forward[0], forward[2]) == (collect[2], clean[0])  # from the right edge of one box to the left edge of the next
+    assert (wrap[1], wrap[-1]) == (clean[3], mould[1])           # from the bottom of a box down to the top of the next row
+    assert (back[1], back[-1]) == (mould[3], collect[1])
+    assert len(items) == 1 + 2 * len(STEPS["steps"]) + 3
+
+def test_charts_export_to_postscript():
+    document = to_postscript(build_chart("diagram", STEPS))
+    assert document.startswith("%!PS-Adobe-3.0 EPSF-3.0")
+    assert "(Collect)" in document
+    assert build_chart("pie_chart", STEPS) == ()
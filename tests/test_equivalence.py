@@ -0,0 +1,43 @@
+"""Invariants that rule changes must keep.
+
+The vectorized scorer in features must give exactly the bands of
+score_essay.
+"""
+import pytest
+
+from scoring import score_essay
+
+CONNECTORS = ["however", "moreover", "therefore", "firstly", "secondly", "although"]  # "although" is not scored
+ERRORS = ["he are", "could of been", "informations", "more better"]  # one issue each
+
+def make_essay(words=260, lengths=(4,), connectors=0, paragraphs=1, errors=0):
+    """Builds an essay of `words` tokens: the given connectors and errors, then filler words of the given lengths."""
+    tokens = [CONNECTORS[i % len(CONNECTORS)] for i in range(connectors)]
+    tokens += " ".join(ERRORS[:errors]).split()
+    tokens += ["z" * lengths[i % len(lengths)] for i in range(words - len(tokens))]
+    size = max(-(-len(tokens) // paragraphs), 1)
+    return "\n\n".join(" ".join(tokens[i:i + size]) for i in range(0, len(tokens), size))
+
+CASES = (
+    # task response: word counts on both sides of every threshold
+    [(make_essay(words=n), 1) for n in (0, 1, 119, 120, 121, 149, 150, 250, 251)]
+    + [(make_essay(words=n), 2) for n in (199, 200, 249, 250, 350, 351)]
+    # lexical resource: mean word length exactly at and around 3.8, 4.2, 4.5, 4.8 and 5.2
+    + [(make_essay(words=250, lengths=lengths), 2) for lengths in (
+        (3,), (4, 4, 4, 4, 3), (4,), (4, 4, 4, 4, 5), (4, 5), (5, 5, 5, 5, 4), (5,), (5, 5, 5, 5, 6), (6,))]
+    # coherence: connector and paragraph counts around their thresholds
+    + [(make_essay(connectors=c, paragraphs=p), 1 + c % 2) for c in range(8) for p in (1, 2, 3, 5, 6)]
+    # grammar: issue counts around 1 and 3
+    + [(make_essay(errors=e), 2) for e in range(len(ERRORS) + 1)]
+    + [("", 1), ("   \n\n  ", 2)]
+)
+
+def test_vectorized_bands_match_score_essay():
+    features = pytest.importorskip("features")  # needs NumPy
+    essays, tasks = zip(*CASES)
+    bands = features.band_scores(features.feature_matrix(essays), tasks)
+    for (essay, task), row in zip(CASES, bands):
+        result = score_essay(essay, task)
+        expected = [result["bands"][criterion] for criterion in features.SCORE_COLUMNS[:-1]] + [result["score"]]
+        assert row.tolist() == expected, (essay[:60], task)
+    assert features.score_essays(essays, tasks).tolist() == [score_essay(e, t)["score"] for e, t in CASES]
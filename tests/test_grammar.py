@@ -0,0 +1,53 @@
+"""Rule file validation and regex rules."""
+import re
+
+import pytest
+
+from grammar import DEFAULT_RULE_FILE, RuleSet, fold, load_rules
+
+PATTERN = {"id": "agreement", "message": "{count} agreement issue(s), e.g. '{example}'.", "patterns": [{"tokens": ["he", "are"]}]}
+
+def scan(rule_set, text):
+    pairs = re.findall(r'(\w+)(\W*)', text)
+    return rule_set.scan(text, pairs, [fold(word) for word, _ in pairs])
+
+def test_default_rules_load():
+    assert load_rules(DEFAULT_RULE_FILE).rules
+
+def test_regex_rules_match_case_insensitively_and_first_listed_wins():
+    rule_set = RuleSet([
+        PATTERN,
+        {"id": "double-word", "message": "Repeated word: '{example}'.", "regex": r"\b(?P<word>\w+) (?P=word)\b"},
+        {"id": "the-the", "message": "{count} x '{example}'.", "regex": r"\bthe the\b"},
+    ])
+    text = "He are sure The the cost is is high."
+    matches = scan(rule_set, text)
+    assert [(m.rule, m.text) for m in matches] == [("agreement", "He are"), ("double-word", "The the"), ("double-word", "is is")]
+    assert text[matches[1].start:matches[1].end] == "The the"
+    assert rule_set.issues(matches) == ["1 agreement issue(s), e.g. 'He are'.", "Repeated word: 'The the'."]
+
+@pytest.mark.parametrize("rules, problem", [
+    ([{"id": "r", "message": "m", "patterns": [{"tokens": []}]}], "non-empty list"),
+    ([{"id": "r", "message": "m", "patterns": [{"tokens": "he are"}]}], "non-empty list"),
+    ([{"id": "r", "message": "m", "patterns": [{"next_char": "aeiou"}]}], "invalid definition"),
+    ([{"id": "r", "message": "m", "regex": "(unclosed"}], "invalid definition"),
+    ([{"id": "r", "message": "m", "regex": r"\b"}], "empty text"),
+    ([{"id": "r", "message": "m", "regex": "x*"}], "empty text"),
+    ([{"id": "q", "message": "m", "regex": "a b"}, {"id": "r", "message": "m", "regex": "(?i)c d"}], "joined"),
+    ([{"id": "q", "message": "m", "regex": "(?P<w>a) b"}, {"id": "r", "message": "m", "regex": "(?P<w>c) d"}], "joined"),
+    ([{"id": "r", "message": "{counts} issues", "regex": "a b"}], "may only use"),
+    ([{"id": "r", "message": "{} issues", "patterns": [{"tokens": ["a"]}]}], "may only use"),
+    ([{"id": "r", "message": "{count issues", "regex": "a b"}], "may only use"),
+    ([{"id": "r", "message": "{example:d}", "regex": "a b"}], "may only use"),
+    ([{"id": "r", "message": "Use {correction}, not {count}.", "misspellings": {"teh": "the"}}], "may only use"),
+    ([{"id": "r", "message": "m", "misspellings": ["teh"]}], "invalid definition"),
+    ([{"id": "r", "message": "m"}], "expected 'patterns'"),
+    ([dict(PATTERN, id="r"), dict(PATTERN, id="r")], "duplicate id"),
+])
+def test_invalid_rules_raise_value_error_naming_the_rule(rules, problem):
+    with pytest.raises(ValueError, match=rf"^rule r: .*{problem}"):
+        RuleSet(rules)
+
+def test_rule_without_message_is_reported_by_position():
+    with pytest.raises(ValueError, match="^rule 2: expected an object"):
+        RuleSet([PATTERN, {"id": "r", "regex": "a b"}])
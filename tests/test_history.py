@@ -0,0 +1,130 @@
+"""Score history partitions: legacy migration and concurrent writers."""
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from analytics import HistoryAnalytics
+from history import _SCHEMA, adopt_legacy_history, open_history
+
+def write_legacy_db(path, attempts=3):
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    conn.executemany("INSERT INTO attempts VALUES (?, ?, ?, ?, ?)", [(n, 6.0, 7.0, 5.0 + n / 2, 1000.0 + n) for n in range(1, attempts + 1)])
+    conn.execute("INSERT INTO bands VALUES (2, 1, 'lexical_resource', 6.0)")
+    conn.commit()
+    conn.close()
+
+def legacy_paths(tmp_path):
+    return str(tmp_path / "score_history.db"), str(tmp_path / "score_history.json")
+
+def leftovers(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.startswith("score_history."))
+
+def rebuilt(store):
+    analytics = HistoryAnalytics(store.analytics.windows)
+    for attempt, scores in store._attempt_scores():
+        analytics.add(attempt, scores)
+    return analytics.summary()
+
+def test_json_history_keeps_attempt_numbers_and_order(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    with open(legacy_file, 'w') as f:
+        json.dump([["Attempt 1", "5.0", "6.0", "5.5"], ["Attempt 2", "6.0", "7.0", "6.5"], ["bad"], ["x", "7.0", "7.0", "7.0"]], f)
+    store = open_history("amy", str(tmp_path / "h"))
+    assert store.import_legacy(legacy_db, legacy_file) == 3
+    assert [row[:4] for row in store.records()] == [(1, 5.0, 6.0, 5.5), (2, 6.0, 7.0, 6.5), (3, 7.0, 7.0, 7.0)]
+    assert store.analytics.series["overall"].latest == (3, 7.0)
+    assert leftovers(tmp_path) == ["score_history.json.migrated"]
+
+def test_database_history_is_copied_with_bands(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    write_legacy_db(legacy_db)
+    store = open_history("amy", str(tmp_path / "h"))
+    assert store.import_legacy(legacy_db, legacy_file) == 3
+    assert store.get(3) == (3, 6.0, 7.0, 6.5, 1003.0)
+    assert store.analytics.criterion_progress() == {"task1": {"lexical_resource": {
+        "first": 6.0, "latest": 6.0, "best": 6.0, "mean": 6.0, "change": 0.0, "trend": None}}}
+    assert store.analytics.summary() == rebuilt(store)
+    store.append(8.0, 8.0, 8.0)
+    assert store.records()[-1][0] == 4
+    assert leftovers(tmp_path) == ["score_history.db.migrated"]
+
+def test_import_into_a_non_empty_history_is_refused(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    write_legacy_db(legacy_db)
+    store = open_history("amy", str(tmp_path / "h"))
+    store.append(7.0, 7.0, 7.0)
+    with pytest.raises(ValueError):
+        store.import_legacy(legacy_db, legacy_file)
+    assert store.count() == 1
+    assert leftovers(tmp_path) == ["score_history.db"]
+
+def test_failed_import_releases_the_claim(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    with open(legacy_db, 'wb') as f:
+        f.write(b"not a database" * 100)
+    with open(legacy_file, 'w') as f:
+        f.write("{not json")
+    store = open_history("amy", str(tmp_path / "h"))
+    with pytest.raises(sqlite3.DatabaseError):
+        store.import_legacy(legacy_db, legacy_file)
+    assert leftovers(tmp_path) == ["score_history.db", "score_history.json"]
+    assert store.count() == 0
+
+def test_single_user_upgrade_adopts_the_legacy_history(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    write_legacy_db(legacy_db)
+    store = open_history("amy", str(tmp_path / "h"))
+    assert adopt_legacy_history(store, str(tmp_path / "h"), legacy_db, legacy_file) == 3
+    assert store.count() == 3
+
+def test_legacy_history_is_not_adopted_once_other_users_exist(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    write_legacy_db(legacy_db)
+    open_history("bob", str(tmp_path / "h")).close()
+    store = open_history("amy", str(tmp_path / "h"))
+    assert adopt_legacy_history(store, str(tmp_path / "h"), legacy_db, legacy_file) == 0
+    assert store.count() == 0
+    assert leftovers(tmp_path) == ["score_history.db"]
+
+def _import(args):
+    user, directory, legacy_db, legacy_file = args
+    store = open_history(user, directory)
+    try:
+        return store.import_legacy(legacy_db, legacy_file)
+    finally:
+        store.close()
+
+def test_only_one_process_imports_the_legacy_history(tmp_path):
+    legacy_db, legacy_file = legacy_paths(tmp_path)
+    write_legacy_db(legacy_db)
+    with ProcessPoolExecutor(4) as pool:
+        imported = list(pool.map(_import, [(user, str(tmp_path / "h"), legacy_db, legacy_file) for user in "abcd"]))
+    assert sorted(imported) == [0, 0, 0, 3]
+    assert leftovers(tmp_path) == ["score_history.db.migrated"]
+
+def _append(args):
+    directory, worker = args
+    store = open_history("shared", directory)
+    try:
+        for n in range(25):
+            if n % 5 == 0:
+                store.append_many([(6.0, 6.5, 6.5), (5.5, 6.0, 6.0, None, {2: {"task_response": 7.0}})])
+            else:
+                store.append(6.0, 7.0 + worker / 2, 6.5, bands={1: {"lexical_resource": 6.0}})
+    finally:
+        store.close()
+
+def test_concurrent_appends_to_one_partition(tmp_path):
+    directory = str(tmp_path / "h")
+    open_history("shared", directory).close()
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_append, [(directory, worker) for worker in range(4)]))
+    store = open_history("Shared", directory)
+    assert store.count() == 4 * 30
+    assert [row[0] for row in store.records()] == list(range(1, 121))
+    assert store.analytics.count == 120
+    assert store.analytics.summary() == rebuilt(store)
@@ -0,0 +1,49 @@
+"""IncrementalAnalyzer.analyze must give exactly the EssayAnalysis of analyze_essay, however the essay was edited."""
+import random
+
+import pytest
+
+from scoring import IncrementalAnalyzer, analyze_essay
+
+BASE_ESSAY = (
+    "  Firstly, the chart shows that informations about İstanbul rose.\n"
+    "He are sure; on the other hand, an   apple a day.\n\n"
+    "Moreover , people could of been  happier .  \t\n"
+    "   \n"
+    "In conclusion the ſtrange trend continued, as a result of costs.  "
+)
+
+def _edits(text, rng):
+    """Yields a sequence of edited versions of text: inserts, deletions and paragraph splits and merges."""
+    snippets = ["however ", "\n\n", "\n", " a ", "apple", "on the other\nhand ", "İ", ".", "  ", "informations "]
+    for _ in range(200):
+        position = rng.randint(0, len(text))
+        action = rng.random()
+        if action < 0.5:
+            text = text[:position] + rng.choice(snippets) + text[position:]
+        elif action < 0.8:
+            text = text[:position] + text[position + rng.randint(1, 12):]
+        else:
+            text = text.replace("\n\n", " ", 1) if rng.random() < 0.5 else text + "\n\n" + rng.choice(snippets)
+        yield text
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_analysis_matches_analyze_essay(seed):
+    analyzer = IncrementalAnalyzer()
+    for text in _edits(BASE_ESSAY, random.Random(seed)):
+        assert analyzer.analyze(text) == analyze_essay(text), repr(text)
+
+def test_incremental_analysis_handles_whole_rewrites():
+    analyzer = IncrementalAnalyzer()
+    for text in [BASE_ESSAY, "", "on the\n\nother hand", "on the other hand", BASE_ESSAY.upper(), "\n\n\n", BASE_ESSAY]:
+        assert analyzer.analyze(text) == analyze_essay(text), repr(text)
+
+def test_incremental_analysis_while_typing_a_long_essay():
+    # Appending reuses the grammar matches before the end; edits near the start rescan the rest.
+    analyzer = IncrementalAnalyzer()
+    text = ""
+    for character in "\n\n".join([BASE_ESSAY.strip()] * 3) + " an apple a orange he are":
+        text += character
+        assert analyzer.analyze(text) == analyze_essay(text), repr(text)
+    for edited in [" " + text, text.replace("He are", "He is", 1), text.replace("an   apple", "a apple", 1), "x" + text]:
+        assert analyzer.analyze(edited) == analyze_essay(edited), repr(edited)
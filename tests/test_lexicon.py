@@ -0,0 +1,65 @@
+"""Building, reading and surviving damaged lexicon files."""
+import struct
+
+import pytest
+
+import lexicon
+from lexicon import Lexicon, build_lexicon, open_lexicon
+
+ENTRIES = [("Apple", 900, "A1", False), ("analyse", 3000, "B2", True), ("zephyr", 40000, "", False), ("apple", 1200, "A2", False)]
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "lexicon.bin")
+    assert build_lexicon(ENTRIES, path) == 3
+    return path
+
+def patch(path, offset, fmt, *values):
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(struct.pack(fmt, *values))
+
+def header(path):
+    with open(path, 'rb') as f:
+        return lexicon._HEADER.unpack(f.read(lexicon._HEADER.size))
+
+def test_lookup_and_profile(path):
+    lex = Lexicon(path)
+    assert len(lex) == 3
+    assert lex.lookup("apple") == (900, "A1", False)
+    assert lex.lookup("analyse") == (3000, "B2", True)
+    assert lex.lookup("zephyr") == (40000, None, False)
+    assert lex.lookup("pear") is None
+    profile = lex.profile(["apple", "analyse", "zephyr", "pear"])
+    assert (profile["listed_words"], profile["rare_word_ratio"], profile["awl_coverage"]) == (3, 1 / 3, 0.25)
+    lex.close()
+
+def test_slot_pointing_past_the_records_reads_as_missing(path):
+    _, slots, _, _, _, _ = header(path)
+    patch(path, lexicon._HEADER.size + lexicon._slot(b"apple", slots) * lexicon._SLOT.size, '<I', 0xFFFFFFFF)
+    lex = Lexicon(path)
+    assert lex.lookup("apple") is None
+    assert lex.lookup("analyse") == (3000, "B2", True)
+    lex.close()
+
+def test_record_with_an_unknown_level_reads_as_missing(path):
+    _, _, _, records, _, _ = header(path)
+    patch(path, records + 6, '<B', 200)  # "analyse" sorts first; its level byte follows the offset and length
+    lex = Lexicon(path)
+    assert lex.lookup("analyse") is None
+    lex.close()
+
+def test_table_without_empty_slots_does_not_loop(path):
+    _, slots, _, _, _, _ = header(path)
+    patch(path, lexicon._HEADER.size, f'<{slots}I', *[1] * slots)
+    lex = Lexicon(path)
+    assert lex.lookup("pear") is None
+    lex.close()
+
+@pytest.mark.parametrize("damage", [b"", b"not a lexicon", lexicon.MAGIC + b"\0" * 52])
+def test_unreadable_files_are_treated_as_missing(tmp_path, damage, capsys):
+    path = tmp_path / "lexicon.bin"
+    path.write_bytes(damage)
+    assert open_lexicon(str(path)) is None
+    assert "continuing without a lexicon" in capsys.readouterr().err
+    assert open_lexicon(str(tmp_path / "absent.bin")) is None
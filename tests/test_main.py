@@ -0,0 +1,24 @@
+"""main.py keeps the scoring API that importers of the single-file app used."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import scoring
+
+@pytest.mark.parametrize("name", ["score_essay", "assess_grammatical_range_and_accuracy", "assess_lexical_resource",
+                                  "assess_task_1_response", "assess_task_2_response", "assess_coherence_and_cohesion",
+                                  "round_to_half", "overall_score"])
+def test_scoring_functions_are_reexported(name):
+    assert getattr(main, name) is getattr(scoring, name)
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError, match="no attribute 'draw_diagram'"):
+        main.draw_diagram
+
+def test_importing_main_loads_neither_scoring_nor_tk():
+    code = ("import sys, main; assert 'scoring' not in sys.modules and 'tkinter' not in sys.modules;"
+            "main.score_essay('Hello there.', 2); assert 'scoring' in sys.modules and 'tkinter' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(main.__file__)), check=True)
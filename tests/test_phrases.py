@@ -0,0 +1,55 @@
+"""Cohesive-device matching: whole words, longest match, paragraph breaks and the scored connectors."""
+import json
+import re
+
+import pytest
+
+from grammar import fold
+from phrases import DEFAULT_PHRASE_FILE, PhraseIndex, load_phrases
+
+def counts(index, text):
+    pairs = re.findall(r'(\w+)(\W*)', text)
+    return index.counts(pairs, [fold(word) for word, _ in pairs])
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return load_phrases(DEFAULT_PHRASE_FILE)
+
+def test_phrases_match_whole_words_only(lexicon):
+    assert counts(lexicon, "In additional costs, moreover.") == {"moreover": 1}
+    assert counts(lexicon, "In addition, costs rose.") == {"in addition": 1}
+    assert counts(lexicon, "Howevers aside, however") == {"however": 1}
+
+def test_longest_phrase_wins_without_overlaps(lexicon):
+    assert counts(lexicon, "As a result of this, as a result, prices rose.") == {"as a result of": 1, "as a result": 1}
+    assert counts(lexicon, "in addition to this in addition to that") == {"in addition to this": 1, "in addition": 1}
+
+def test_phrases_span_line_breaks_but_not_paragraph_breaks(lexicon):
+    assert counts(lexicon, "on the other\nhand") == {"on the other hand": 1}
+    assert counts(lexicon, "on the other\n  \nhand") == {}
+    assert counts(lexicon, "in, addition") == {}
+
+def test_scored_count_includes_extensions_of_scored_phrases():
+    index = PhraseIndex({"cause": ["as a result", "as a result of", "hence"], "addition": ["also"]}, scored=["As a result", "also"])
+    assert index.scored == {"as a result", "as a result of", "also"}
+    found = counts(index, "As a result of rain, hence also as a result.")
+    assert found == {"as a result of": 1, "hence": 1, "also": 1, "as a result": 1}
+    assert index.scored_count(found) == 3
+    assert index.by_category(found) == {"cause": 3, "addition": 1}
+
+def test_every_phrase_is_scored_without_a_scored_list():
+    index = PhraseIndex({"contrast": ["however", "whereas"]})
+    assert index.scored_count(counts(index, "However, whereas.")) == 2
+
+@pytest.mark.parametrize("data, problem", [
+    ({"categories": {"x": "however"}}, "expected a list"),
+    ({"categories": {"x": ["in  , addition"]}}, "not a phrase"),
+    ({"categories": {"x": ["however"], "y": ["However"]}}, "already in x"),
+    ({"categories": {"x": ["however"]}, "scored": ["whereas"]}, "not a phrase of the lexicon"),
+    ({"categories": {"x": ["however"]}, "scored": "however"}, "must be a list"),
+])
+def test_invalid_lexicons_name_the_file(tmp_path, data, problem):
+    path = tmp_path / "phrases.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValueError, match=rf"^{re.escape(str(path))}: .*{problem}"):
+        load_phrases(str(path))
@@ -0,0 +1,66 @@
+"""Prompt bank indexing, skipped shards and sampling."""
+import json
+import random
+
+import pytest
+
+from prompts import PromptBank, PromptSampler, main
+
+def prompt(prompt_id, task=2, topic="tourism"):
+    entry = {"id": prompt_id, "task": task, "topic": topic, "text": f"Prompt {prompt_id}."}
+    if task == 1:
+        entry.update(type="bar_chart", data={"title": "t", "labels": [], "values": []})
+    return entry
+
+def write_shard(directory, name, *lines):
+    (directory / name).write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n", encoding="utf-8")
+
+@pytest.fixture
+def bank_dir(tmp_path):
+    write_shard(tmp_path, "a.jsonl", prompt("t2-a"), prompt("t1-a", task=1, topic="trade"))
+    return tmp_path
+
+def test_bank_indexes_and_reads_prompts(bank_dir):
+    bank = PromptBank(str(bank_dir))
+    assert bank.errors == []
+    assert bank.ids() == ["t1-a", "t2-a"]
+    assert bank.topics(task=1) == {"trade": 1}
+    assert bank.get("t2-a")["text"] == "Prompt t2-a."
+    with pytest.raises(KeyError):
+        bank.get("missing")
+    bank.close()
+
+@pytest.mark.parametrize("lines, problem", [
+    ([prompt("t2-b"), "{not json"], "b.jsonl:2: invalid JSON"),
+    ([prompt("t2-b"), dict(prompt("t1-b", task=1), type="pie_chart")], "b.jsonl:2: 'type' must be one of"),
+    ([prompt("t2-b"), prompt("t2-a")], "b.jsonl: a prompt id is already used"),
+])
+def test_malformed_shards_are_skipped_and_reported(bank_dir, lines, problem):
+    write_shard(bank_dir, "b.jsonl", *lines)
+    bank = PromptBank(str(bank_dir))
+    assert len(bank.errors) == 1 and problem in bank.errors[0]
+    assert bank.ids() == ["t1-a", "t2-a"]  # none of the skipped shard's prompts, not even those before the error
+    bank.close()
+
+    write_shard(bank_dir, "b.jsonl", prompt("t2-b"))
+    bank = PromptBank(str(bank_dir))
+    assert bank.errors == []
+    assert bank.ids(task=2) == ["t2-a", "t2-b"]
+    bank.close()
+
+def test_prompts_command_reports_skipped_shards(bank_dir, monkeypatch, capsys):
+    write_shard(bank_dir, "b.jsonl", "[]")
+    monkeypatch.setattr("prompts.PromptBank", lambda: PromptBank(str(bank_dir)))
+    assert main([]) == 1
+    out, err = capsys.readouterr()
+    assert "t2-a" in out and "skipped" in err and "b.jsonl:1: expected a JSON object" in err
+
+def test_sampler_does_not_repeat_within_a_round(tmp_path):
+    write_shard(tmp_path, "a.jsonl", *[prompt(f"t2-{n}") for n in range(5)])
+    bank = PromptBank(str(tmp_path))
+    sampler = PromptSampler(bank, 2, rng=random.Random(3))
+    first, second = [sampler.draw()["id"] for _ in range(5)], [sampler.draw()["id"] for _ in range(5)]
+    assert sorted(first) == sorted(second) == [f"t2-{n}" for n in range(5)]
+    assert second[0] != first[-1]
+    assert PromptSampler(bank, 1).draw() is None
+    bank.close()
@@ -0,0 +1,48 @@
+"""The HTTP scoring service: request validation and error replies."""
+import http.client
+import json
+import threading
+
+import pytest
+
+from server import ScoringServer
+
+ESSAY = json.dumps({"task": 2, "text": "Technology changes how people live. However, it has costs."}).encode()
+
+@pytest.fixture
+def server():
+    server = ScoringServer(("127.0.0.1", 0), workers=1, executor="thread")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def post(server, body=b"", headers=()):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    conn.putrequest("POST", "/score")
+    for name, value in headers:
+        conn.putheader(name, value)
+    conn.endheaders(body)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+def test_scores_an_essay(server):
+    status, payload = post(server, ESSAY, [("Content-Length", str(len(ESSAY)))])
+    assert status == 200 and set(payload) == {"score", "reasons"}
+
+@pytest.mark.parametrize("length, status", [(None, 411), ("abc", 400), ("-1", 400), ("1.5", 400), (str(20 * 1024 * 1024), 413)])
+def test_rejects_a_bad_content_length(server, length, status):
+    headers = [] if length is None else [("Content-Length", length)]
+    assert post(server, headers=headers)[0] == status
+    assert server.stats.snapshot()["errors_total"] == 1
+
+def test_scoring_failure_is_reported_as_500(server, monkeypatch):
+    def broken(records):
+        raise RuntimeError("worker died")
+    monkeypatch.setattr(server, "score", broken)
+    status, payload = post(server, ESSAY, [("Content-Length", str(len(ESSAY)))])
+    assert status == 500 and "worker died" in payload["error"]
+    assert server.stats.snapshot()["errors_total"] == 1